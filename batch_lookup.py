@@ -0,0 +1,174 @@
+# 장소 이름 일괄 조회 (네이버 지역 검색, python batch_lookup.py queries.csv -o places.jsonl)
+# - 입력: JSONL (한 줄에 {"id": ..., "query": ...} 또는 문자열) / CSV (query 열, 없으면 첫 번째 열)
+# - 정해진 수의 작업 스레드로 동시에 조회 (속도 제한/일일 한도와 캐시는 화면과 같은 travel_core 경로를 그대로 탄다)
+# - 결과는 끝나는 대로 한 줄씩 출력 파일에 쓴다 (.jsonl 은 행마다 한 줄, .csv 는 장소마다 한 줄)
+# - 끝난 행 id 는 체크포인트 파일(<출력>.ckpt)에 남기고, 다시 실행하면 그 행은 건너뛴다
+#   (실패한 행은 출력/체크포인트에 남기지 않고 stderr 에만 알리므로 다음 실행에서 다시 조회)
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from travel_core.naver_search import lookup_places
+from travel_core.rate_limit import get_limiter
+
+CSV_FIELDS = ["id", "query", "status", "rank", "title", "address", "category", "lat", "lng"]
+
+
+# 1. 입력 읽기 -> (id, query)
+def read_queries(path, query_field="query", id_field="id"):
+    if path.lower().endswith(".csv"):
+        yield from _read_csv(path, query_field, id_field)
+    else:
+        yield from _read_jsonl(path, query_field, id_field)
+
+
+def _read_jsonl(path, query_field, id_field):
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            row = json.loads(line)
+            if isinstance(row, str):
+                yield str(line_no), row
+            else:
+                yield str(row.get(id_field, line_no)), row.get(query_field, "")
+
+
+def _read_csv(path, query_field, id_field):
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        column = query_field if query_field in (reader.fieldnames or []) else (reader.fieldnames or [None])[0]
+        for row_no, row in enumerate(reader, 1):
+            yield str(row.get(id_field) or row_no), row.get(column) or ""
+
+
+# 2. 체크포인트 (끝난 id 를 한 줄에 하나씩)
+def load_checkpoint(path):
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+# 3. 한 행 조회 (limit 개까지). 속도 제한에 걸리거나 일시적으로 실패하면 조금 쉬었다가 다시
+def lookup(row_id, query, limit, retries=3, backoff=1.0):
+    places = lookup_places(query)
+    for attempt in range(retries):
+        if places is not None:
+            break
+        time.sleep(backoff * (attempt + 1))
+        places = lookup_places(query)
+    if places is None:
+        return {"id": row_id, "query": query, "status": "error", "places": []}
+    places = [p.as_dict() for p in places[:limit]]
+    return {"id": row_id, "query": query, "status": "ok" if places else "not_found", "places": places}
+
+
+class Writer:
+    def __init__(self, path, resume):
+        self.csv = path.lower().endswith(".csv")
+        exists = resume and os.path.exists(path) and os.path.getsize(path) > 0
+        self._file = open(path, "a" if resume else "w", encoding="utf-8", newline="")
+        if self.csv:
+            self._csv = csv.DictWriter(self._file, fieldnames=CSV_FIELDS)
+            if not exists:
+                self._csv.writeheader()
+
+    def write(self, record):
+        if not self.csv:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        elif not record["places"]:
+            self._csv.writerow({"id": record["id"], "query": record["query"], "status": record["status"]})
+        else:
+            for rank, place in enumerate(record["places"], 1):
+                self._csv.writerow(dict(place, id=record["id"], query=record["query"], status=record["status"], rank=rank))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+# 4. 전체 실행: 동시에 처리 중인 행은 workers * 2 개까지만 (입력이 커도 메모리 일정)
+def run(input_path, output_path, workers=4, limit=1, checkpoint_path=None, resume=True,
+        query_field="query", id_field="id", retries=3, max_consecutive_errors=20, progress_every=100):
+    checkpoint_path = checkpoint_path or output_path + ".ckpt"
+    done = load_checkpoint(checkpoint_path) if resume else set()
+    writer = Writer(output_path, resume)
+    checkpoint = open(checkpoint_path, "a" if resume else "w", encoding="utf-8")
+    counts = {"ok": 0, "not_found": 0, "error": 0, "skipped": 0}
+    consecutive_errors = 0
+    started = time.monotonic()
+    pending = set()
+
+    def finish(future):
+        nonlocal consecutive_errors
+        record = future.result()
+        counts[record["status"]] += 1
+        if record["status"] == "error":
+            # 출력에는 쓰지 않는다 (다음 실행에서 다시 조회하면 행이 두 번 생기므로)
+            consecutive_errors += 1
+            print(f"lookup failed: id={record['id']} query={record['query']!r}", file=sys.stderr)
+            return
+        consecutive_errors = 0
+        writer.write(record)
+        checkpoint.write(record["id"] + "\n")
+        checkpoint.flush()
+        handled = counts["ok"] + counts["not_found"] + counts["error"]
+        if progress_every and handled % progress_every == 0:
+            rate = handled / max(1e-9, time.monotonic() - started)
+            print(f"{handled} rows ({rate:.1f}/s) {counts}", file=sys.stderr, flush=True)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="lookup") as executor:
+            for row_id, query in read_queries(input_path, query_field, id_field):
+                if row_id in done:
+                    counts["skipped"] += 1
+                    continue
+                # 연속으로 계속 실패하면 (일일 한도 소진, 키 오류 등) 남은 행을 낭비하지 않고 멈춘다
+                if consecutive_errors >= max_consecutive_errors:
+                    print(f"stopping after {consecutive_errors} consecutive errors", file=sys.stderr)
+                    break
+                pending.add(executor.submit(lookup, row_id, query, limit, retries))
+                if len(pending) >= workers * 2:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        finish(future)
+            for future in wait(pending).done:
+                finish(future)
+    finally:
+        writer.close()
+        checkpoint.close()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resolve place names in bulk through Naver local search")
+    parser.add_argument("input", help="queries as .jsonl or .csv")
+    parser.add_argument("-o", "--output", required=True, help="output .jsonl (one line per query) or .csv (one row per place)")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent lookups")
+    parser.add_argument("--limit", type=int, default=1, help="places to keep per query (1 = geocoding)")
+    parser.add_argument("--query-field", default="query")
+    parser.add_argument("--id-field", default="id")
+    parser.add_argument("--checkpoint", help="default: <output>.ckpt")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and overwrite the output")
+    parser.add_argument("--retries", type=int, default=3, help="retries per query after a failure")
+    parser.add_argument("--max-errors", type=int, default=20, help="stop after this many consecutive failures")
+    args = parser.parse_args(argv)
+
+    counts = run(
+        args.input, args.output, workers=args.workers, limit=args.limit, checkpoint_path=args.checkpoint,
+        resume=not args.restart, query_field=args.query_field, id_field=args.id_field,
+        retries=args.retries, max_consecutive_errors=args.max_errors,
+    )
+    usage = get_limiter().usage("naver")
+    print(f"done: {counts} (naver quota used today: {usage['used']}/{usage['daily']})", file=sys.stderr)
+    return 1 if counts["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+# 벤치마크 (python -m bench.run_bench)
+# - 외부 API 대신 bench/stub_servers.py 의 로컬 스텁 서버를 쓰므로 인터넷 없이 돌아간다
+# - 항목 수(10 ~ 10k)별로 검색 결과 파싱/정렬, 거리 계산, 카카오/folium HTML 생성, rerun 전체를 잰다
+# - 결과: 평균 / p50 / p95 / p99 (ms) 와 초당 처리량(ops/s)
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from bench.stub_servers import CENTER_LAT, CENTER_LNG, fake_items, start_stub
+
+DEFAULT_SIZES = "10,100,1000,10000"
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(q / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+# fn 을 repeat 번 실행해서 걸린 시간(초) 목록. setup 은 매번 실행 전에 호출 (시간에 포함 안 함)
+def measure(fn, repeat, setup=None, warmup=1):
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def summarize(name, size, times):
+    times = sorted(times)
+    mean = statistics.fmean(times)
+    return {
+        "name": name,
+        "size": size,
+        "runs": len(times),
+        "mean_ms": mean * 1000,
+        "p50_ms": percentile(times, 50) * 1000,
+        "p95_ms": percentile(times, 95) * 1000,
+        "p99_ms": percentile(times, 99) * 1000,
+        "ops_per_s": 1.0 / mean if mean > 0 else float("inf"),
+    }
+
+
+def print_row(row):
+    print(
+        f"{row['name']:<28} {row['size']:>6} {row['runs']:>5} {row['mean_ms']:>10.3f} {row['p50_ms']:>10.3f} "
+        f"{row['p95_ms']:>10.3f} {row['p99_ms']:>10.3f} {row['ops_per_s']:>12.1f}",
+        flush=True,
+    )
+
+
+def random_points(n, seed=0):
+    rnd = random.Random(seed)
+    return [(CENTER_LAT + rnd.uniform(-0.1, 0.1), CENTER_LNG + rnd.uniform(-0.1, 0.1)) for _ in range(n)]
+
+
+# 1. 검색 응답 파싱 + 사용자 기준 거리 정렬
+def bench_search_parse(size, repeat):
+    from travel_core import naver_search
+
+    payload = {"items": fake_items("명동 맛집", 1, size)}
+    parsed = naver_search.parse_places(payload)
+    return [
+        summarize("search.parse", size, measure(lambda: naver_search.parse_places(payload), repeat)),
+        summarize("search.rank_for_user", size, measure(
+            lambda: naver_search.rank_for_user(parsed, CENTER_LAT, CENTER_LNG), repeat
+        )),
+    ]
+
+
+# 2. 거리 계산: 한 쌍씩 반복 vs 벡터화
+def bench_distance(size, repeat):
+    from travel_core import geo
+
+    points = random_points(size)
+    lats = [p[0] for p in points]
+    lngs = [p[1] for p in points]
+    return [
+        summarize("distance.loop", size, measure(
+            lambda: [geo.haversine(CENTER_LAT, CENTER_LNG, lat, lng) for lat, lng in points], repeat
+        )),
+        summarize("distance.vectorized", size, measure(
+            lambda: geo.distances_from(CENTER_LAT, CENTER_LNG, lats, lngs), repeat
+        )),
+    ]
+
+
+# 3. 지도 HTML 생성 (cold: 메모 캐시 비운 상태 / warm: 같은 입력 재사용)
+def bench_map_html(size, repeat, with_folium=True):
+    from travel_core import map_render
+
+    markers = [
+        {"lat": lat, "lng": lng, "title": f"장소 {i}", "name": f"장소 {i}", "address": f"주소 {i}", "rank": i + 1}
+        for i, (lat, lng) in enumerate(random_points(size, seed=1))
+    ]
+    rows = []
+    kakao = lambda: map_render.kakao_map_html("BENCH_KEY", CENTER_LAT, CENTER_LNG, markers)
+    rows.append(summarize("kakao_html.cold", size, measure(kakao, repeat, setup=map_render.clear_cache)))
+    rows.append(summarize("kakao_html.warm", size, measure(kakao, repeat)))
+    if with_folium:
+        folium_html = lambda: map_render.folium_map_html([CENTER_LAT, CENTER_LNG], 13, markers)
+        # folium 은 항목이 많으면 한 번에 수 초가 걸리므로 반복 횟수를 줄인다
+        cold_repeat = max(1, repeat // 10) if size >= 1000 else repeat
+        rows.append(summarize("folium_html.cold", size, measure(
+            folium_html, cold_repeat, setup=map_render.clear_cache
+        )))
+        rows.append(summarize("folium_html.warm", size, measure(folium_html, repeat)))
+    return rows
+
+
+def clear_all_caches():
+    from travel_core import map_render
+    from travel_core import naver_search
+    from travel_core import travel_info
+    from travel_core.disk_cache import get_disk_cache
+
+    travel_info.weather_cache().clear()
+    travel_info.exchange_cache().clear()
+    naver_search.search_cache().clear()
+    map_render.clear_cache()
+    disk = get_disk_cache()
+    if disk is not None:
+        disk.clear()
+
+
+# 4. 스크립트 rerun 한 번 흉내 (kakao_maps.py / naver_maps.py 의 본문 순서대로)
+def simulated_rerun(city_name):
+    from travel_core import naver_search
+    from travel_core.map_render import folium_map_html, kakao_map_html
+    from travel_core.poi_store import get_store
+    from travel_core.route_optimizer import optimize_route
+    from travel_core.travel_info import get_exchange_rate, get_weather
+
+    store = get_store()
+    get_exchange_rate("BENCH_KEY")
+    city = store.city(city_name)
+    get_weather(city["lat"], city["lng"], "BENCH_KEY")
+    items = city["spots"] + city["food"]
+    order = optimize_route([(d["lat"], d["lng"]) for d in items], time_budget=0.05)
+    markers = [{"lat": items[i]["lat"], "lng": items[i]["lng"], "title": items[i]["name"]} for i in order]
+    kakao_map_html("BENCH_KEY", city["lat"], city["lng"], markers)
+    results = naver_search.search_places(f"{city_name} 맛집", CENTER_LAT, CENTER_LNG)
+    folium_map_html(
+        [CENTER_LAT, CENTER_LNG], 13, [p.as_dict() for p in results], user_location={"lat": CENTER_LAT, "lng": CENTER_LNG}
+    )
+
+
+def bench_rerun(repeat):
+    from travel_core.poi_store import get_store
+
+    city_name = get_store().city_names()[0]
+    run = lambda: simulated_rerun(city_name)
+    return [
+        summarize("rerun.cold", 0, measure(run, repeat, setup=clear_all_caches)),
+        summarize("rerun.warm", 0, measure(run, repeat)),
+    ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Travel app benchmarks against local stub APIs")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="comma separated item counts")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="stub API latency")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of stub responses that are 503")
+    parser.add_argument("--no-folium", action="store_true", help="skip folium (slow at 10k items)")
+    parser.add_argument("--quick", action="store_true", help="sizes 10,100,1000 and 10 repeats")
+    parser.add_argument("--out", help="write results as JSON to this file")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.sizes = "10,100,1000"
+        args.repeat = min(args.repeat, 10)
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    stub = start_stub(args.latency_ms, args.jitter_ms, args.error_rate)
+    # 앱 모듈은 import 할 때 환경변수를 읽으므로 import 전에 설정한다
+    cache_dir = tempfile.mkdtemp(prefix="travel-bench-")
+    os.environ["TRAVEL_CACHE_DIR"] = cache_dir
+    os.environ["NAVER_API_BASE"] = stub.base_url
+    os.environ["OPENWEATHER_API_BASE"] = stub.base_url
+    os.environ["EXCHANGE_API_BASE"] = stub.base_url
+    os.environ["RATE_LIMIT_ENABLED"] = "0"
+    os.environ.setdefault("NAVER_CLIENT_ID", "bench")
+    os.environ.setdefault("NAVER_CLIENT_SECRET", "bench")
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    print(f"stub api: {stub.base_url} latency={args.latency_ms}ms jitter={args.jitter_ms}ms "
+          f"error_rate={args.error_rate} cache_dir={cache_dir}")
+    print(f"{'benchmark':<28} {'size':>6} {'runs':>5} {'mean ms':>10} {'p50 ms':>10} "
+          f"{'p95 ms':>10} {'p99 ms':>10} {'ops/s':>12}")
+    rows = []
+    try:
+        for size in sizes:
+            for row in bench_search_parse(size, args.repeat) + bench_distance(size, args.repeat):
+                print_row(row)
+                rows.append(row)
+            for row in bench_map_html(size, args.repeat, with_folium=not args.no_folium):
+                print_row(row)
+                rows.append(row)
+        for row in bench_rerun(max(1, args.repeat // 5)):
+            print_row(row)
+            rows.append(row)
+    finally:
+        stub.stop()
+    print(f"stub requests served: {stub.requests}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": rows}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
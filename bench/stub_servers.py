@@ -0,0 +1,116 @@
+# 로컬 스텁 API 서버 (벤치마크용, 인터넷 없이 동작)
+# - 네이버 지역 검색 / OpenWeather 현재 날씨 / ExchangeRate-API 응답을 흉내 낸다
+# - latency_ms(+jitter_ms) 만큼 늦게 응답하고, error_rate 확률로 503 을 돌려준다
+# - 127.0.0.1 의 빈 포트에 띄우고 base_url 을 NAVER_API_BASE 등 환경변수로 넘겨서 쓴다
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# 가짜 장소를 뿌릴 중심 (서울 시청)
+CENTER_LAT = 37.5665
+CENTER_LNG = 126.9780
+CATEGORIES = ("음식점>한식", "음식점>카페", "여행,명소>관광명소", "쇼핑,유통>시장")
+
+
+def fake_items(query, start, display, seed=0):
+    rnd = random.Random(f"{seed}:{query}:{start}")
+    items = []
+    for i in range(display):
+        lat = CENTER_LAT + rnd.uniform(-0.05, 0.05)
+        lng = CENTER_LNG + rnd.uniform(-0.05, 0.05)
+        items.append({
+            "title": f"<b>{query}</b> 가게 {start + i}",
+            "link": "",
+            "category": rnd.choice(CATEGORIES),
+            "description": "",
+            "telephone": "",
+            "address": f"서울특별시 중구 테스트동 {start + i}",
+            "roadAddress": f"서울특별시 중구 테스트로 {start + i}",
+            "mapx": str(int(lng * 10000000)),
+            "mapy": str(int(lat * 10000000)),
+        })
+    return items
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # 요청 로그는 벤치마크 출력만 지저분하게 한다
+
+    def do_GET(self):
+        server = self.server
+        server.count()
+        delay = server.latency_ms + random.uniform(0, server.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000.0)
+        if server.error_rate and random.random() < server.error_rate:
+            self._send(503, {"error": "injected"})
+            return
+
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if url.path == "/v1/search/local.json":
+            display = int(params.get("display", 5))
+            start = int(params.get("start", 1))
+            items = fake_items(params.get("query", ""), start, display, server.seed)
+            self._send(200, {"total": len(items), "start": start, "display": display, "items": items})
+        elif url.path == "/data/2.5/weather":
+            self._send(200, {
+                "coord": {"lat": float(params.get("lat", 0)), "lon": float(params.get("lon", 0))},
+                "weather": [{"main": "Clear", "description": "clear sky", "icon": "01d"}],
+                "main": {"temp": 21.5, "feels_like": 21.0, "humidity": 40},
+                "name": "Stub",
+            })
+        elif url.path.startswith("/v6/") and url.path.endswith("/latest/USD"):
+            self._send(200, {"result": "success", "base_code": "USD", "conversion_rates": {"USD": 1, "KRW": 1380.5}})
+        else:
+            self._send(404, {"error": "not found"})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, seed=0):
+        super().__init__(("127.0.0.1", 0), StubHandler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.seed = seed
+        self.requests = 0
+        self._count_lock = threading.Lock()
+        self._thread = None
+
+    def count(self):
+        with self._count_lock:
+            self.requests += 1
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="stub-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+# 서버 하나로 세 API 를 모두 흉내 낸다 (경로가 겹치지 않음)
+def start_stub(latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, seed=0):
+    return StubServer(latency_ms, jitter_ms, error_rate, seed).start()
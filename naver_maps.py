@@ -1,15 +1,23 @@
 import streamlit as st # 웹사이트 화면을 만드는 도구 상자
-from dotenv import load_dotenv # API 키 로드
-import os # 시스템 설정
-import requests # 네이버 API 요청
-import folium # 지도 생성
-import math # 거리 계산
+from travel_core.config import get_secret # API 키 조회 (Secrets / .env, 처음 쓸 때 로드)
+from travel_core.naver_search import iter_search, rank_for_user # 네이버 API 요청 (검색어 정규화 + 전역 캐시 + 스트리밍) / 거리 정렬
+from travel_core.places import EMPTY_RESULT, SHARED_MAX_PLACES # 세션에는 공유 캐시의 장소 참조 + 거리만 (최대 개수 제한)
+from travel_core.autocomplete import get_autocomplete # 이미 아는 장소 이름 색인 (POI + 검색했던 장소)
+from travel_core.map_render import folium_map_html # 지도 생성 (folium 은 처음 그릴 때 로드, 결과 캐시)
+from travel_core.clustering import CLUSTER_MIN_POINTS, cluster_points, expand_bbox, viewport_bbox # 마커가 많을 때 서버에서 묶기
+from travel_core.spatial_index import named_index # 검색했던 장소들의 공간 인덱스 (세션 공유)
+from travel_core.rate_limit import get_limiter # 검색 API 일일 사용량 확인
 import streamlit.components.v1 as components # iframe 렌더링을 위한 컴포넌트
+from travel_core.metrics import span, start_rerun, finish_rerun, start_exporter, debug_panel # 단계별 시간 측정
 
-# 1. 환경 변수 로드
-load_dotenv()
-NAVER_CLIENT_ID = os.getenv("NAVER_CLIENT_ID")
-NAVER_CLIENT_SECRET = os.getenv("NAVER_CLIENT_SECRET")
+# 이번 rerun 의 단계별 시간 측정 시작 (/metrics 내보내기는 프로세스당 한 번만 시작)
+start_rerun("naver")
+start_exporter()
+
+# 1. API 키 (Secrets -> .env 순서)
+NAVER_CLIENT_ID = get_secret("NAVER_CLIENT_ID")
+NAVER_CLIENT_SECRET = get_secret("NAVER_CLIENT_SECRET")
+MAP_WIDTH_PX = 1200 # 클러스터 계산에 쓰는 지도 가로 크기(px, 대략값)
 
 # 2. 페이지 설정
 st.set_page_config(
@@ -27,7 +35,7 @@ if not NAVER_CLIENT_ID or NAVER_CLIENT_ID == "your_naver_client_id_here":
 
 # 4. Session State 초기화
 if "search_results" not in st.session_state:
-    st.session_state.search_results = []
+    st.session_state.search_results = EMPTY_RESULT
 if "last_query" not in st.session_state:
     st.session_state.last_query = ""
 if "user_location" not in st.session_state:
@@ -47,118 +55,124 @@ if location and location.get("latitude") and location.get("longitude"):
 else:
     st.info("위치 버튼을 클릭하여 현재 위치를 가져오세요.")
 
-# 6. 거리 계산 함수
-def calculate_distance(lat1, lon1, lat2, lon2):
-    R = 6371
-    dlat = math.radians(lat2 - lat1)
-    dlon = math.radians(lon2 - lon1)
-    a = math.sin(dlat/2)**2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon/2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
-    return R * c
-
-# 7. 네이버 검색 API 호출 함수
-def search_places(query, user_lat=None, user_lng=None):
-    if not query:
-        return []
-
-    url = "https://openapi.naver.com/v1/search/local.json"
-    headers = {
-        "X-Naver-Client-Id": NAVER_CLIENT_ID,
-        "X-Naver-Client-Secret": NAVER_CLIENT_SECRET
-    }
-    params = {"query": query, "display": 10, "sort": "random"}
-
-    try:
-        response = requests.get(url, headers=headers, params=params)
-        if response.status_code == 200:
-            data = response.json()
-            items = data.get("items", [])
-            results = []
-            for item in items:
-                lng = int(item.get("mapx", 0)) / 10000000.0
-                lat = int(item.get("mapy", 0)) / 10000000.0
-                if lat > 0 and lng > 0:
-                    distance = calculate_distance(user_lat, user_lng, lat, lng) if user_lat else None
-                    results.append({
-                        "title": item.get("title", "").replace("<b>", "").replace("</b>", ""),
-                        "address": item.get("roadAddress", "") or item.get("address", ""),
-                        "category": item.get("category", ""),
-                        "lat": lat,
-                        "lng": lng,
-                        "distance": distance
-                    })
-            if user_lat and user_lng:
-                results.sort(key=lambda x: x["distance"] if x["distance"] else float('inf'))
-            return results
-        return []
-    except:
-        return []
-
 # 8. 검색 UI
 st.subheader("🔍 장소 검색")
 with st.form(key="search_form"):
     search_query = st.text_input("검색할 장소를 입력하세요")
+    deep_search = st.checkbox("깊은 검색 (여러 페이지 + '맛집'/'카페' 검색어를 함께 검색)")
+    local_first = st.checkbox("저장된 장소와 이름이 정확히 같으면 바로 보여주기 (네이버 API 를 부르지 않음)", value=False)
     search_clicked = st.form_submit_button("검색", type="primary")
 
-if search_clicked and search_query:
-    lat = st.session_state.user_location["lat"] if st.session_state.user_location else None
-    lng = st.session_state.user_location["lng"] if st.session_state.user_location else None
-    results = search_places(search_query, lat, lng)
-    st.session_state.search_results = results
-    st.session_state.last_query = search_query
+# 네이버 검색 일일 한도에 가까우면 알려 주기 (이때는 캐시된 결과 위주로 보여줌)
+naver_usage = get_limiter().usage("naver")
+if naver_usage["ratio"] >= 0.9:
+    st.warning(f"⚠️ 오늘 검색 한도의 {naver_usage['ratio']:.0%}를 사용했습니다. 저장된 결과 위주로 보여드립니다.")
 
-# 10. 지도 생성 및 iframe 렌더링 함수
-def render_map_iframe():
+# 10. 지도 생성 및 iframe 렌더링 함수 (slot: 결과가 도착할 때마다 같은 자리를 다시 그리기 위한 placeholder)
+def render_map_iframe(results, slot):
     if st.session_state.user_location:
         center = [st.session_state.user_location["lat"], st.session_state.user_location["lng"]]
         zoom = 14
-    elif st.session_state.search_results:
-        center = [st.session_state.search_results[0]["lat"], st.session_state.search_results[0]["lng"]]
+    elif results:
+        center = [results[0].lat, results[0].lng]
         zoom = 14
     else:
         center = [37.5665, 126.9780]
         zoom = 12
 
-    m = folium.Map(location=center, zoom_start=zoom)
+    with span("naver.map_html"):
+        # 결과가 많으면 현재 줌 기준으로 서버에서 묶고, 화면 주변에 있는 것만 보낸다 (번호는 목록 순위 유지)
+        places = [dict(place.as_dict(), rank=idx) for idx, place in enumerate(results, 1)]
+        clusters = []
+        if len(places) > CLUSTER_MIN_POINTS:
+            bbox = expand_bbox(viewport_bbox(center[0], center[1], zoom, MAP_WIDTH_PX, 500))
+            clusters, places = cluster_points(places, zoom, bbox=bbox, label_key="title")
 
-    # 내 위치 마커
-    if st.session_state.user_location:
-        folium.Marker(
-            [st.session_state.user_location["lat"], st.session_state.user_location["lng"]],
-            popup="📍 내 위치",
-            icon=folium.Icon(color="blue", icon="info-sign")
-        ).add_to(m)
-
-    # 검색 결과 마커
-    for idx, place in enumerate(st.session_state.search_results, 1):
-        popup_text = f"<b>{idx}. {place['title']}</b><br>{place['address']}"
-        folium.Marker(
-            [place["lat"], place["lng"]],
-            popup=folium.Popup(popup_text, max_width=200),
-            icon=folium.Icon(color="red")
-        ).add_to(m)
-
-    # Folium 지도를 HTML 문자열로 변환
-    map_html = m._repr_html_()
-    
-    # iframe으로 화면에 띄우기
-    components.html(map_html, height=500)
+        # Folium 지도 HTML (중심/줌/마커가 같으면 캐시된 HTML 재사용 -> iframe 을 다시 불러오지 않음)
+        map_html = folium_map_html(center, zoom, places, st.session_state.user_location, clusters)
 
-# 11. 지도 출력
+    # iframe으로 화면에 띄우기
+    with slot.container():
+        components.html(map_html, height=500)
+
+# 12. 검색 결과 목록 렌더링 함수
+def render_result_list(results, query, slot, pending=0):
+    with slot.container():
+        if not results:
+            if pending:
+                st.caption("⏳ 검색 중...")
+            return
+        st.subheader(f"📋 '{query}' 결과 리스트")
+        if pending:
+            st.caption(f"⏳ 결과를 더 불러오는 중... (남은 페이지 {pending}개)")
+        for idx, place, distance in results.ranked():
+            col1, col2 = st.columns([7, 2])
+            with col1:
+                st.markdown(f"**{idx}. {place.title}**")
+                st.caption(f"{place.address} ({place.category})")
+            with col2:
+                if distance:
+                    st.write(f"📏 {distance:.2f}km")
+            st.divider()
+
+# 11. 지도 / 결과 목록 자리 만들기
 st.subheader("🗺️ 지도 보기")
-render_map_iframe()
-
-# 12. 검색 결과 목록
-if st.session_state.search_results:
-    st.subheader(f"📋 '{st.session_state.last_query}' 결과 리스트")
-    for idx, place in enumerate(st.session_state.search_results, 1):
-        col1, col2 = st.columns([7, 2])
-        with col1:
-            st.markdown(f"**{idx}. {place['title']}**")
-            st.caption(f"{place['address']} ({place['category']})")
-        with col2:
-            if place['distance']:
-                st.write(f"📏 {place['distance']:.2f}km")
-        st.divider()
-
-st.caption("© 2026 - Naver Search API + Folium iframe")
\ No newline at end of file
+map_slot = st.empty()
+list_slot = st.empty()
+
+if search_clicked and search_query:
+    lat = st.session_state.user_location["lat"] if st.session_state.user_location else None
+    lng = st.session_state.user_location["lng"] if st.session_state.user_location else None
+    # 결과가 도착하는 대로 지도 마커와 목록을 먼저 그리고, 나머지 페이지가 오면 다시 채운다
+    results = EMPTY_RESULT
+    hits = []
+    if local_first and not deep_search:
+        # 이미 아는 장소(POI + 전에 검색된 장소) 중 이름 전체가 검색어와 같은 것만 (접두어/부분 일치는 네이버로)
+        with span("naver.autocomplete"):
+            hits = get_autocomplete().exact(search_query)
+    if hits:
+        results = rank_for_user([place for _, place, _ in hits], lat, lng)
+        render_map_iframe(results, map_slot)
+        st.caption(f"💾 이름이 같은 저장된 장소 {len(results)}곳을 보여드립니다. 네이버에서 찾으려면 '저장된 장소와 이름이 정확히 같으면 바로 보여주기'를 끄고 검색하세요.")
+    else:
+        render_result_list(results, search_query, list_slot, pending=1)
+        # naver.search 는 중간 렌더링(naver.map_html)까지 포함한 전체 스트리밍 시간
+        with span("naver.search"):
+            for results, pending in iter_search(search_query, lat, lng, deep=deep_search):
+                render_map_iframe(results, map_slot)
+                render_result_list(results, search_query, list_slot, pending)
+    if not results:
+        render_map_iframe(results, map_slot)
+    render_result_list(results, search_query, list_slot)
+    st.session_state.search_results = results
+    st.session_state.last_query = search_query
+    # 한 번 찾은 장소는 공유 인덱스에 쌓아 두고 주변 장소 찾기에 재사용 (최근 SHARED_MAX_PLACES 개 정도만)
+    place_index = named_index("naver_places", max_items=SHARED_MAX_PLACES)
+    for place in results:
+        place_index.add(place.lat, place.lng, place, key=(place.title, round(place.lat, 6), round(place.lng, 6)))
+    # 다음부터는 이름만으로도 바로 찾도록 자동완성 색인에도 추가
+    if not hits:
+        get_autocomplete().add_places(results)
+else:
+    render_map_iframe(st.session_state.search_results, map_slot)
+    render_result_list(st.session_state.search_results, st.session_state.last_query, list_slot)
+
+# 13. 내 주변에서 이미 검색된 장소 (API 호출 없이 공간 인덱스에서 반경 검색)
+if st.session_state.user_location:
+    st.subheader("📍 내 주변에서 찾아본 장소")
+    radius_m = st.slider("반경 (m)", min_value=100, max_value=5000, value=1000, step=100)
+    with span("naver.nearby"):
+        nearby = named_index("naver_places").radius(
+            st.session_state.user_location["lat"], st.session_state.user_location["lng"], radius_m, limit=20
+        )
+    if nearby:
+        for d, place in nearby:
+            st.write(f"- **{place.title}** ({place.category}) · {d:,.0f}m")
+    else:
+        st.caption("반경 안에 검색된 장소가 없습니다.")
+
+st.caption("© 2026 - Naver Search API + Folium iframe")
+
+# 단계별 시간 (사이드바 디버그 패널, ?debug=1) + 이번 rerun 전체 시간 기록
+debug_panel()
+finish_rerun()
\ No newline at end of file
@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from travel_core.autocomplete import AutocompleteIndex
+from travel_core.places import Place
+
+
+# 체인점 지점이 색인의 대부분인 경우 (흔한 3-gram 의 역색인이 아주 길다)
+@pytest.fixture(scope="module")
+def chains():
+    rnd = random.Random(0)
+    syllables = [chr(0xAC00 + rnd.randrange(11172)) for _ in range(300)]
+    areas = ["".join(rnd.choice(syllables) for _ in range(rnd.randint(2, 3))) for _ in range(400)]
+    names = ["스타벅스", "파리바게뜨", "이디야커피", "다이소"]
+    index = AutocompleteIndex(max_search_entries=5000)
+    for _ in range(5000):
+        if rnd.random() < 0.8:
+            name = f"{rnd.choices(names, weights=[10, 8, 2, 1])[0]} {rnd.choice(areas)}점"
+        else:
+            name = "".join(rnd.choice(syllables) for _ in range(rnd.randint(2, 6)))
+        index.add(name, Place(name, "서울", "cafe", 37 + rnd.random(), 127 + rnd.random()), "search")
+    return index
+
+
+@pytest.mark.parametrize("typo, name", [("스타벅수", "스타벅스"), ("파리바게트", "파리바게뜨"), ("이디아커피", "이디야커피")])
+def test_typo_matches_common_names(chains, typo, name):
+    hits = chains.suggest(typo, limit=5)
+    assert len(hits) == 5
+    assert all(label.startswith(name) for label, _, _ in hits)
+
+
+def test_prefix_and_chosung(chains):
+    assert all(label.startswith("파리바") for label, _, _ in chains.suggest("파리바", limit=5))
+    assert all(label.startswith("스타벅스") for label, _, _ in chains.suggest("ㅅㅌㅂㅅ", limit=5))
+
+
+def _contents(index):
+    label = lambda entry_id: index._entries[entry_id][0]
+    return (
+        sorted((key, tier, label(entry_id)) for key, tier, entry_id in index._prefix),
+        sorted((key, tier, label(entry_id)) for key, tier, entry_id in index._initials),
+        {gram: sorted(map(label, posting)) for gram, posting in index._grams.items()},
+    )
+
+
+def test_eviction_leaves_the_same_index_as_a_fresh_build():
+    places = [Place(f"북촌 한옥 {i}번지 (Hanok {i})", "서울", "cafe", 37.5 + i * 1e-3, 127.0) for i in range(300)]
+    index = AutocompleteIndex(max_search_entries=50)
+    index.add_places(places)
+    fresh = AutocompleteIndex(max_search_entries=50)
+    fresh.add_places(places[-50:])
+    assert len(index) == 50
+    assert _contents(index) == _contents(fresh)
+    assert index.suggest("북촌 한옥 299")[0][0] == "북촌 한옥 299번지 (Hanok 299)"
+    assert index.exact("북촌 한옥 0번지") == []
+    # 빠진 장소는 다시 넣을 수 있다
+    index.add(places[0].title, places[0], "search")
+    assert [label for label, _, _ in index.exact("북촌 한옥 0번지")] == ["북촌 한옥 0번지 (Hanok 0)"]
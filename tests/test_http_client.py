@@ -0,0 +1,93 @@
+import pytest
+
+from travel_core import http_client
+from travel_core.rate_limit import RateLimitExceeded
+
+
+class _Limiter:
+    def __init__(self, error=None):
+        self.error = error
+
+    def admit(self, provider, has_fallback=False):
+        if self.error is not None:
+            raise self.error
+
+
+class _Response:
+    status_code = 200
+    content = b"{}"
+
+
+@pytest.fixture
+def endpoint(monkeypatch):
+    # 한 번 실패하면 열리고, 바로 half-open 이 되는 엔드포인트
+    endpoint = http_client.Endpoint("naver", retries=0, failure_threshold=1, reset_timeout=0.0)
+    monkeypatch.setitem(http_client.ENDPOINTS, "naver", endpoint)
+    endpoint.breaker.record_failure()
+    assert endpoint.breaker.state == "half-open"
+    return endpoint
+
+
+def test_rate_limited_probe_does_not_leave_breaker_stuck(monkeypatch, endpoint):
+    monkeypatch.setattr(http_client, "get_limiter", lambda: _Limiter(RateLimitExceeded("naver: rate limit")))
+    with pytest.raises(http_client.RateLimitedError):
+        http_client.get("naver", "http://example.invalid/")
+
+    # 속도 제한이 풀리면 다음 요청이 시험 요청으로 나가서 브레이커를 닫는다
+    monkeypatch.setattr(http_client, "get_limiter", lambda: _Limiter())
+    monkeypatch.setattr(http_client.get_session(), "get", lambda *args, **kwargs: _Response())
+    assert http_client.get("naver", "http://example.invalid/").status_code == 200
+    assert endpoint.breaker.state == "closed"
+
+
+def test_unexpected_request_error_is_upstream_error(monkeypatch, endpoint):
+    def fail(*args, **kwargs):
+        raise http_client.requests.exceptions.ChunkedEncodingError("connection broken")
+
+    monkeypatch.setattr(http_client, "get_limiter", lambda: _Limiter())
+    monkeypatch.setattr(http_client.get_session(), "get", fail)
+    with pytest.raises(http_client.UpstreamError):
+        http_client.get("naver", "http://example.invalid/")
+    # 실패로 기록돼서 다시 시험 요청을 받을 수 있는 상태
+    assert endpoint.breaker.allow()
+
+
+def test_only_one_probe_while_half_open(endpoint):
+    assert endpoint.breaker.allow()
+    assert not endpoint.breaker.allow()
+    endpoint.breaker.release_probe()
+    assert endpoint.breaker.allow()
+
+
+class _DiskCache:
+    def __init__(self, cached):
+        self.cached = cached
+
+    def get(self, key):
+        return self.cached
+
+
+class _Cached:
+    body = b'{"value": "old"}'
+    etag = None
+    stored_at = 0.0
+    fresh = False
+
+
+@pytest.mark.parametrize("error, served_stale", [
+    (http_client.UpstreamError("naver: HTTP 503"), True),
+    (http_client.CircuitOpenError("naver: circuit open"), True),
+    (http_client.RateLimitedError("naver: rate limit"), True),
+    (http_client.ClientError("naver: HTTP 401", 401), False),
+])
+def test_stale_fallback_only_for_upstream_trouble(monkeypatch, error, served_stale):
+    def fail(*args, **kwargs):
+        raise error
+
+    monkeypatch.setattr(http_client, "get_disk_cache", lambda: _DiskCache(_Cached()))
+    monkeypatch.setattr(http_client, "get", fail)
+    if served_stale:
+        assert http_client.get_json_cached("naver", "http://example.invalid/") == {"value": "old"}
+    else:
+        with pytest.raises(http_client.ClientError):
+            http_client.get_json_cached("naver", "http://example.invalid/")
@@ -0,0 +1,35 @@
+import pytest
+
+from travel_core import http_client, naver_search
+
+
+@pytest.fixture
+def naver(monkeypatch):
+    calls = []
+
+    # start 가 1 보다 크면 400 을 주는 API (네이버 지역 검색처럼)
+    def get_json_cached(endpoint_name, url, params=None, headers=None, ttl=600, max_age=None):
+        calls.append((params["query"], params["start"]))
+        if params["start"] > 1:
+            raise http_client.ClientError("naver: HTTP 400", 400)
+        return {"items": [{"title": params["query"], "mapx": "1269780000", "mapy": "375665000"}]}
+
+    monkeypatch.setattr(http_client, "get_json_cached", get_json_cached)
+    monkeypatch.setattr(naver_search, "_page_limit", 3)
+    naver_search.search_cache().clear()
+    naver_search.rejected_cache().clear()
+    yield calls
+    naver_search.search_cache().clear()
+    naver_search.rejected_cache().clear()
+
+
+def test_rejected_pages_are_not_requested_again(naver):
+    first = naver_search.deep_search("명동", pages=3, variants=("맛집",))
+    assert len(first) == 2
+    assert len(naver) == 6
+
+    # 거절된 페이지는 기억하고, 이후 깊은 검색은 API 가 주는 1페이지만 요청한다
+    assert naver_search.lookup_places("명동", start=11) is None
+    naver_search.deep_search("성수", pages=3, variants=("맛집",))
+    assert len(naver) == 8
+    assert all(start == 1 for _, start in naver[6:])
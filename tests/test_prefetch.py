@@ -0,0 +1,45 @@
+import pytest
+
+from travel_core import http_client, prefetch, rate_limit, travel_info
+
+
+@pytest.fixture
+def shared_disk(monkeypatch):
+    # 레플리카들이 같이 쓰는 디스크 캐시 흉내: max_age 안이면 저장된 응답, 아니면 업스트림 호출
+    state = {"now": 0.0, "stored_at": None, "upstream": 0}
+
+    def get_json_cached(endpoint_name, url, params=None, headers=None, ttl=600, max_age=None):
+        stored_at = state["stored_at"]
+        if stored_at is None or state["now"] - stored_at > max_age:
+            state["upstream"] += 1
+            state["stored_at"] = state["now"]
+        return {"conversion_rates": {"KRW": 1300.0}}
+
+    monkeypatch.setattr(http_client, "get_json_cached", get_json_cached)
+    travel_info.exchange_cache().clear()
+    yield state
+    travel_info.exchange_cache().clear()
+
+
+def test_exchange_cadence_follows_daily_quota():
+    limit = rate_limit.LIMITS["exchangerate"]
+    (job,) = prefetch.travel_jobs([], None, "key")
+    assert job.every >= travel_info.EXCHANGE_TTL / 2
+    assert 86400 / job.every <= limit.daily * limit.soft_ratio * prefetch.QUOTA_SHARE
+
+
+@pytest.mark.parametrize("replicas", [1, 3, 8])
+def test_replicas_share_one_refresh_per_interval(shared_disk, replicas):
+    limit = rate_limit.LIMITS["exchangerate"]
+    jobs = [prefetch.travel_jobs([], None, "key")[0] for _ in range(replicas)]
+    # 레플리카마다 시작 시각이 다르다
+    offsets = [i * 97.0 for i in range(replicas)]
+    tick = 5.0
+    for step in range(int(86400 / tick)):
+        now = step * tick
+        shared_disk["now"] = now
+        for job, offset in zip(jobs, offsets):
+            if now >= offset and job.due(now):
+                job.last_attempt = now
+                assert job.fn()
+    assert shared_disk["upstream"] <= limit.daily * limit.soft_ratio
@@ -0,0 +1,59 @@
+import random
+import time
+
+import pytest
+
+from travel_core import route_optimizer
+from travel_core.route_optimizer import optimize_route, route_length
+
+
+def _points(n, seed=0):
+    rnd = random.Random(seed)
+    return [(37.4 + rnd.random() * 0.3, 126.8 + rnd.random() * 0.4) for _ in range(n)]
+
+
+@pytest.mark.parametrize("n", [3, 10, 60])
+@pytest.mark.parametrize("start, end", [(None, None), (0, None), (None, 1), (0, 1)])
+def test_result_is_permutation_with_fixed_ends(n, start, end):
+    order = optimize_route(_points(n), start=start, end=end)
+    assert sorted(order) == list(range(n))
+    if start is not None:
+        assert order[0] == start
+    if end is not None:
+        assert order[-1] == end
+
+
+def test_start_equal_to_end_only_fixes_start():
+    order = optimize_route(_points(20), start=5, end=5)
+    assert sorted(order) == list(range(20))
+    assert order[0] == 5
+
+
+@pytest.mark.parametrize("n", [0, 1, 2])
+def test_tiny_inputs(n):
+    assert sorted(optimize_route(_points(n))) == list(range(n))
+
+
+def test_two_points_respect_fixed_ends():
+    points = _points(2)
+    assert optimize_route(points, start=1) == [1, 0]
+    assert optimize_route(points, end=0) == [1, 0]
+
+
+def test_improves_on_input_order():
+    points = _points(60)
+    order = optimize_route(points, time_budget=0.2)
+    assert route_length(points, order) < route_length(points, list(range(60)))
+
+
+@pytest.mark.parametrize("n", [route_optimizer.MATRIX_MAX_POINTS, route_optimizer.MATRIX_MAX_POINTS * 3])
+def test_time_budget_holds_on_matrix_and_sweep_paths(n):
+    points = _points(n)
+    optimize_route(points[:10])  # numpy import 은 시간에 넣지 않는다
+    started = time.perf_counter()
+    order = optimize_route(points, start=0, end=n - 1, time_budget=0.05)
+    elapsed = time.perf_counter() - started
+    assert sorted(order) == list(range(n))
+    assert (order[0], order[-1]) == (0, n - 1)
+    # 마감 확인 사이의 한 단계 + 느린 CI 여유
+    assert elapsed < 0.05 + 0.1
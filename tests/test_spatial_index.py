@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from travel_core import geo
+from travel_core.spatial_index import GridIndex, named_index
+
+
+_sorted = {}
+
+
+def _brute(points, lat, lng, k, max_meters=None):
+    key = (id(points), lat, lng)
+    if key not in _sorted:
+        _sorted[key] = sorted((geo.haversine(lat, lng, p_lat, p_lng) * 1000, i) for i, (p_lat, p_lng) in enumerate(points))
+    found = _sorted[key]
+    if max_meters is not None:
+        found = [item for item in found if item[0] <= max_meters]
+    return found[:k]
+
+
+def _index(points, cell_deg):
+    index = GridIndex(cell_deg)
+    for i, (lat, lng) in enumerate(points):
+        index.add(lat, lng, i)
+    return index
+
+
+@pytest.fixture(scope="module")
+def seoul():
+    # 서울 주변에 몰린 점 + 전국에 흩어진 점 조금
+    rnd = random.Random(1)
+    points = [(37.5 + rnd.gauss(0, 0.05), 127.0 + rnd.gauss(0, 0.05)) for _ in range(5000)]
+    points += [(rnd.uniform(33.2, 38.5), rnd.uniform(125.0, 129.5)) for _ in range(200)]
+    return points
+
+
+@pytest.mark.parametrize("cell_deg", [0.005, 0.02])
+@pytest.mark.parametrize("k", [1, 5, 30])
+def test_nearest_matches_brute_force(seoul, cell_deg, k):
+    index = _index(seoul, cell_deg)
+    rnd = random.Random(0)
+    # 데이터 안쪽, 가장자리, 그리고 데이터 범위 밖(제주 남쪽 바다, 북한/동해 쪽) 질의
+    queries = [(37.55, 127.0), (37.3, 126.7), (33.0, 126.5), (39.5, 131.0), (30.0, 120.0)]
+    queries += [(rnd.uniform(31.0, 40.0), rnd.uniform(123.0, 132.0)) for _ in range(20)]
+    for lat, lng in queries:
+        for max_meters in (None, 1000, 50000):
+            got = index.nearest(lat, lng, k=k, max_meters=max_meters)
+            expected = _brute(seoul, lat, lng, k, max_meters)
+            assert [round(d, 6) for d, _ in got] == [round(d, 6) for d, _ in expected], (lat, lng, max_meters)
+
+
+def test_nearest_from_outside_sparse_index():
+    points = [(37.5, 127.0), (35.1, 129.0)]
+    index = _index(points, 0.005)
+    (distance, item), = index.nearest(33.4, 126.5, k=1)
+    assert item == 1
+    assert distance == pytest.approx(_brute(points, 33.4, 126.5, 1)[0][0])
+    assert [item for _, item in index.nearest(37.5, 127.0, k=5)] == [0, 1]
+
+
+def test_radius_and_bbox_match_brute_force(seoul):
+    index = _index(seoul, 0.005)
+    found = index.radius(37.5, 127.0, 800)
+    expected = [item for item in _brute(seoul, 37.5, 127.0, len(seoul), 800)]
+    assert [round(d, 6) for d, _ in found] == [round(d, 6) for d, _ in expected]
+    inside = {i for i, (lat, lng) in enumerate(seoul) if 37.45 <= lat <= 37.55 and 126.95 <= lng <= 127.05}
+    assert set(index.bbox(37.45, 126.95, 37.55, 127.05)) == inside
+
+
+def test_named_index_cap_keeps_newest():
+    for i in range(300):
+        named_index("test_cap", max_items=100).add(37.0 + i * 1e-4, 127.0, i, key=i)
+    index = named_index("test_cap", max_items=100)
+    assert len(index) <= 100
+    assert index.nearest(37.0 + 299e-4, 127.0, k=1)[0][1] == 299
+    # 남아 있는 key 로는 다시 추가되지 않는다
+    size = len(index)
+    index.add(37.0 + 299e-4, 127.0, "dup", key=299)
+    assert len(index) == size
@@ -0,0 +1,55 @@
+# 여행 가이드 공용 라이브러리 (스트림릿 화면 / 배치 작업이 같이 쓴다)
+# - data:      poi_store (도시/POI 저장소), spatial_index (반경/근접 검색)
+# - geo:       geo (거리 계산), clustering (줌별 마커 묶기)
+# - search:    naver_search (네이버 지역 검색 + 캐시), places (장소 레코드), autocomplete (장소 이름 자동완성), travel_info (날씨/환율)
+# - routing:   route_optimizer (방문 순서 최적화)
+# - rendering: map_render (카카오맵/folium HTML)
+# - 하위 모듈은 처음 쓸 때 import 한다 (import travel_core 만으로는 requests/numpy/folium 을 불러오지 않음)
+import importlib
+
+_EXPORTS = {
+    # data
+    "get_store": "poi_store",
+    "get_poi_index": "poi_store",
+    "GridIndex": "spatial_index",
+    "named_index": "spatial_index",
+    # geo
+    "haversine": "geo",
+    "distances_from": "geo",
+    "distance_matrix": "geo",
+    "rank_by_distance": "geo",
+    "cluster_points": "clustering",
+    # search
+    "normalize_query": "naver_search",
+    "parse_places": "naver_search",
+    "search_places": "naver_search",
+    "iter_search": "naver_search",
+    "Place": "places",
+    "SearchResult": "places",
+    "get_autocomplete": "autocomplete",
+    "get_weather": "travel_info",
+    "get_exchange_rate": "travel_info",
+    # routing
+    "optimize_route": "route_optimizer",
+    "route_length": "route_optimizer",
+    # rendering
+    "kakao_map_html": "map_render",
+    "folium_map_html": "map_render",
+    # config
+    "get_secret": "config",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value  # 다음부터는 바로 찾도록
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,267 @@
+# 장소 이름 자동완성 (메모리 색인, 프로세스당 하나)
+# - 대상: 전체 POI(city_data) + 검색해서 받은 장소들 (네트워크 없이 바로 찾기)
+# - 한글은 자모 단위로 풀어서 비교하므로 "경복ㄱ", "겨" 처럼 입력 중인 글자도 맞고, 초성("ㄱㅂㄱ")만으로도 찾는다
+# - "경복궁 (Gyeongbokgung Palace)" 처럼 괄호 안 영어 이름과 각 단어 시작으로도 찾는다
+# - 접두어는 정렬된 키 목록 + bisect, 중간 일치/오타는 자모 3-gram 역색인으로 후보를 줄여서 확인
+import bisect
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from collections import Counter, deque
+from itertools import islice
+
+from .places import SHARED_MAX_PLACES, Place
+
+# 한글 음절 = 초성 19 x 중성 21 x 종성 28
+_CHO = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+_JONG = " ㄱㄲㄳㄴㄵㄶㄷㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅄㅅㅆㅇㅈㅊㅋㅌㅍㅎ"
+# 겹모음/겹받침은 입력 도중 모양("고" -> "과")과 맞도록 기본 자모로 나눈다
+_SPLIT = {
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+}
+_CONSONANTS = set("ㄱㄲㄳㄴㄵㄶㄷㄸㄹㄺㄻㄼㄽㄾㄿㅀㅁㅂㅃㅄㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ")
+# NFKC 는 호환 자모(ㄱ)를 첫가끝 자모(ᄀ)로 바꾸므로 다시 호환 자모로 돌린다
+_CONJOINING = str.maketrans(
+    {**{0x1100 + i: ch for i, ch in enumerate(_CHO)},
+     **{0x1161 + i: ch for i, ch in enumerate(_JUNG)},
+     **{0x11A8 + i: ch for i, ch in enumerate(_JONG[1:])}}
+)
+_PAREN_RE = re.compile(r"\(([^)]*)\)")
+_WORD_RE = re.compile(r"[^\W_]+")
+
+# 오타 허용 검색: 입력한 글자의 3-gram 중 이 비율 이상이 이름에 있어야 후보
+FUZZY_MIN_SCORE = 0.6
+# 오타 허용에서 3-gram 겹침을 세는 후보 수 상한 (체인점처럼 흔한 이름에서 색인 전체를 세지 않도록)
+FUZZY_MAX_CANDIDATES = 300
+# 검색 결과에서 들어오는 장소는 이 개수까지만 보관 (오래된 것부터 뺀다)
+MAX_SEARCH_ENTRIES = SHARED_MAX_PLACES
+
+
+# 1. 문자열 변환
+def _normalize(text):
+    return unicodedata.normalize("NFKC", text or "").translate(_CONJOINING).lower()
+
+
+def jamo(text):
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(_CHO[code // 588])
+            jung = _JUNG[(code % 588) // 28]
+            out.append(_SPLIT.get(jung, jung))
+            jong = _JONG[code % 28]
+            if jong != " ":
+                out.append(_SPLIT.get(jong, jong))
+        else:
+            out.append(_SPLIT.get(ch, ch))
+    return "".join(out)
+
+
+def chosung(text):
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        out.append(_CHO[code // 588] if 0 <= code < 11172 else ch)
+    return "".join(out)
+
+
+def _is_chosung_query(text):
+    return bool(text) and all(ch in _CONSONANTS for ch in text)
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+# 이름 하나 -> (전체 키 목록, 단어 시작 키 목록, 초성 키 목록)
+def _keys(label):
+    text = _normalize(label)
+    english = " ".join(_PAREN_RE.findall(text))
+    native = _PAREN_RE.sub(" ", text)
+    full = [jamo("".join(native.split()))]
+    if english.strip():
+        full.append("".join(english.split()))
+    words = []
+    for part in (native, english):
+        tokens = _WORD_RE.findall(part)
+        # 단어마다 그 단어부터 끝까지 ("북촌 한옥마을" -> "한옥마을")
+        for i in range(1, len(tokens)):
+            words.append(jamo("".join(tokens[i:])))
+    initials = [chosung("".join(native.split()))]
+    initials += [chosung(t) for t in _WORD_RE.findall(native)[1:]]
+    return [k for k in full if k], [k for k in words if k], [k for k in initials if k]
+
+
+# 정렬 목록에서 item 하나 빼기
+def _discard(items, item):
+    i = bisect.bisect_left(items, item)
+    if i < len(items) and items[i] == item:
+        del items[i]
+
+
+# 2. 색인
+class AutocompleteIndex:
+    def __init__(self, max_search_entries=MAX_SEARCH_ENTRIES):
+        self.max_search_entries = max_search_entries
+        self._entries = {}  # id -> (label, Place, source)
+        self._next_id = 0
+        self._by_key = {}  # (label, lat, lng) -> id (중복 방지)
+        self._prefix = []  # 정렬된 (키, tier, id) - tier 0: 전체 이름, 1: 단어 시작
+        self._initials = []  # 정렬된 (초성 키, tier, id)
+        self._grams = {}  # 자모 3-gram -> {id}
+        self._keys = {}  # id -> (전체, 단어 시작, 초성) 키 목록 (중간 일치 확인 + 뺄 때 사용)
+        self._search_ids = deque()  # 검색 결과에서 들어온 id (들어온 순서)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._by_key)
+
+    # label 로 찾게 되는 장소 하나 추가. source: "poi" | "search"
+    def add(self, label, place, source="poi"):
+        dedupe = (label, round(place.lat, 5), round(place.lng, 5))
+        with self._lock:
+            if dedupe in self._by_key:
+                return self._by_key[dedupe]
+            full, words, initials = _keys(label)
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (label, place, source)
+            self._by_key[dedupe] = entry_id
+            self._keys[entry_id] = (full, words, initials)
+            for key in full:
+                bisect.insort(self._prefix, (key, 0, entry_id))
+                for gram in _trigrams(key):
+                    self._grams.setdefault(gram, set()).add(entry_id)
+            for key in words:
+                bisect.insort(self._prefix, (key, 1, entry_id))
+            for i, key in enumerate(initials):
+                bisect.insort(self._initials, (key, 0 if i == 0 else 1, entry_id))
+            if source == "search":
+                self._search_ids.append(entry_id)
+                if len(self._search_ids) > self.max_search_entries:
+                    self._remove(self._search_ids.popleft())
+            return entry_id
+
+    # 검색 결과(Place 목록) 한꺼번에 추가
+    def add_places(self, places, source="search"):
+        for place in places:
+            self.add(place.title, place, source)
+
+    # 잠금을 잡은 상태에서만 호출. 넣을 때 만든 키로 그 항목만 찾아서 지운다 (색인 전체를 다시 만들지 않는다)
+    def _remove(self, entry_id):
+        label, place, _ = self._entries.pop(entry_id)
+        del self._by_key[(label, round(place.lat, 5), round(place.lng, 5))]
+        full, words, initials = self._keys.pop(entry_id)
+        for key in full:
+            _discard(self._prefix, (key, 0, entry_id))
+        # 한글 키와 영어 키에 같은 3-gram 이 있을 수 있다
+        for gram in set().union(*map(_trigrams, full)):
+            posting = self._grams[gram]
+            posting.discard(entry_id)
+            if not posting:
+                del self._grams[gram]
+        for key in words:
+            _discard(self._prefix, (key, 1, entry_id))
+        for i, key in enumerate(initials):
+            _discard(self._initials, (key, 0 if i == 0 else 1, entry_id))
+
+    def _scan_prefix(self, keys, query, found, limit):
+        i = bisect.bisect_left(keys, (query,))
+        while i < len(keys) and len(found) < limit * 4:
+            key, tier, entry_id = keys[i]
+            if not key.startswith(query):
+                break
+            if entry_id not in found or found[entry_id] > tier:
+                found[entry_id] = tier
+            i += 1
+
+    # 띄어쓰기/대소문자를 빼고 이름 전체(한글 이름 또는 괄호 안 영어 이름)가 text 와 같은 항목
+    def exact(self, text):
+        query = jamo("".join(_normalize(text).split()))
+        if not query:
+            return []
+        with self._lock:
+            i = bisect.bisect_left(self._prefix, (query,))
+            found = []
+            while i < len(self._prefix) and self._prefix[i][0] == query:
+                if self._prefix[i][1] == 0:
+                    found.append(self._entries[self._prefix[i][2]])
+                i += 1
+            return found
+
+    # 3. 조회: [(label, Place, source)] 잘 맞는 순서 (접두어 > 단어 시작 > 중간 일치 > 오타 허용)
+    def suggest(self, text, limit=8, fuzzy=True):
+        text = _normalize(text)
+        query = "".join(text.split())
+        if not query:
+            return []
+        found = {}  # id -> tier
+        with self._lock:
+            if _is_chosung_query(query):
+                self._scan_prefix(self._initials, query, found, limit)
+            else:
+                query = jamo(query)
+                self._scan_prefix(self._prefix, query, found, limit)
+                if len(found) < limit and len(query) >= 3:
+                    self._match_grams(query, found, limit, fuzzy)
+            entries = self._entries
+            ranked = heapq.nsmallest(limit, found.items(), key=lambda kv: (kv[1], len(entries[kv[0]][0]), kv[0]))
+            return [entries[entry_id] for entry_id, _ in ranked]
+
+    # 중간 일치 (모든 3-gram 을 가진 후보 중 실제로 포함하는 것) -> 모자라면 3-gram 겹침 비율로 오타 허용
+    # 접두어 검색처럼 후보는 limit * 4 개까지만 확인한다
+    def _match_grams(self, query, found, limit, fuzzy):
+        grams = _trigrams(query)
+        postings = sorted((self._grams.get(g, ()) for g in grams), key=len)
+        if postings and postings[0]:
+            for entry_id in postings[0].intersection(*postings[1:]):
+                if len(found) >= limit * 4:
+                    break
+                if entry_id not in found and any(query in key for key in self._keys[entry_id][0]):
+                    found[entry_id] = 2
+        # 3-gram 이 3개 미만(두 글자 정도)이면 오타 허용은 의미가 없다
+        if not fuzzy or len(found) >= limit or len(grams) < 3:
+            return
+        # need 개 이상 겹치는 이름은 가장 드문 (개수 - need + 1) 개의 3-gram 중 하나는 반드시 가지고 있다
+        need = max(2, math.ceil(FUZZY_MIN_SCORE * len(grams)))
+        # 후보가 너무 많으면 드문 3-gram 쪽부터 상한까지만 센다 (흔한 이름은 그중 몇 개만 보여줘도 충분)
+        candidates = set()
+        for posting in postings[:len(grams) - need + 1]:
+            room = FUZZY_MAX_CANDIDATES - len(candidates)
+            if len(posting) <= room:
+                candidates.update(posting)
+            else:
+                candidates.update(islice(posting, room))
+                break
+        candidates.difference_update(found)
+        counts = Counter()
+        for posting in postings:
+            counts.update(candidates.intersection(posting))
+        for entry_id, shared in counts.items():
+            if shared >= need:
+                found[entry_id] = 3 + (1 - shared / len(grams))
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+# 전체 POI 를 넣은 프로세스 공용 색인 (처음 쓸 때 한 번 생성)
+def get_autocomplete():
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                from .poi_store import get_store
+
+                index = AutocompleteIndex()
+                for poi in get_store().iter_pois():
+                    index.add(poi["name"], Place(poi["name"], poi["city"], poi["type"], poi["lat"], poi["lng"]), "poi")
+                _index = index
+    return _index
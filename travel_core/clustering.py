@@ -0,0 +1,153 @@
+# 서버 쪽 마커 클러스터링 (줌 레벨별 격자)
+# - 웹 메르카토르 픽셀 좌표에서 cell_px 크기 칸으로 점을 묶는다 (줌마다 한 번 계산해서 보관)
+# - 칸에 점이 하나면 그대로(singleton), 여러 개면 개수/중심/범위만 가진 클러스터 하나로 보낸다
+# - 지도에 보내는 항목 수는 화면에 들어가는 칸 수로 제한되므로 POI 가 아무리 많아도 일정하다
+# - 같은 점 목록이면 만들어 둔 ClusterIndex 를 다시 써서 rerun/세션마다 격자를 다시 계산하지 않는다
+import math
+import threading
+from collections import OrderedDict
+
+TILE_SIZE = 256
+CELL_PX = 60
+# 이 개수 이하면 클러스터링 없이 마커를 전부 그린다
+CLUSTER_MIN_POINTS = 50
+MAX_ZOOM = 20
+# 보관해 두는 ClusterIndex 개수 (가장 오래 안 쓴 것부터 삭제) / 인덱스 하나가 보관하는 화면(줌, bbox) 결과 수
+INDEX_CACHE_SIZE = 32
+QUERY_CACHE_SIZE = 16
+
+
+# 1. 좌표 변환
+def _pixel(lat, lng, zoom):
+    world = TILE_SIZE * (2 ** zoom)
+    siny = min(max(math.sin(math.radians(lat)), -0.9999), 0.9999)
+    x = (lng + 180.0) / 360.0 * world
+    y = (0.5 - math.log((1 + siny) / (1 - siny)) / (4 * math.pi)) * world
+    return x, y
+
+
+def _latlng(x, y, zoom):
+    world = TILE_SIZE * (2 ** zoom)
+    lng = x / world * 360.0 - 180.0
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / world))))
+    return lat, lng
+
+
+# 지도 화면(width x height px)에 보이는 범위 (south, west, north, east)
+def viewport_bbox(center_lat, center_lng, zoom, width_px, height_px):
+    cx, cy = _pixel(center_lat, center_lng, zoom)
+    north, west = _latlng(cx - width_px / 2, cy - height_px / 2, zoom)
+    south, east = _latlng(cx + width_px / 2, cy + height_px / 2, zoom)
+    return south, west, north, east
+
+
+# 모든 점이 화면에 들어가는 가장 큰 줌
+def fit_zoom(points, width_px, height_px, max_zoom=MAX_ZOOM):
+    if len(points) < 2:
+        return max_zoom
+    for zoom in range(max_zoom, -1, -1):
+        xs, ys = zip(*(_pixel(p["lat"], p["lng"], zoom) for p in points))
+        if max(xs) - min(xs) <= width_px and max(ys) - min(ys) <= height_px:
+            return zoom
+    return 0
+
+
+# 카카오맵 level(1=가장 확대)과 웹 메르카토르 zoom 의 대략적인 대응
+def kakao_level_to_zoom(level):
+    return max(0, min(MAX_ZOOM, 20 - level))
+
+
+def zoom_to_kakao_level(zoom):
+    return max(1, min(14, 20 - zoom))
+
+
+# 2. 줌별 격자 클러스터 (계산한 줌은 보관해서 다시 쓰지 않는다)
+class ClusterIndex:
+    def __init__(self, points, cell_px=CELL_PX, label_key="name"):
+        self.points = points
+        self.cell_px = cell_px
+        self.label_key = label_key
+        self._levels = {}
+        self._queries = {}  # (zoom, bbox) -> (clusters, singles)
+
+    def _level(self, zoom):
+        cells = self._levels.get(zoom)
+        if cells is None:
+            cells = {}
+            for idx, p in enumerate(self.points):
+                x, y = _pixel(p["lat"], p["lng"], zoom)
+                cells.setdefault((int(x // self.cell_px), int(y // self.cell_px)), []).append(idx)
+            self._levels[zoom] = cells
+        return cells
+
+    # (clusters, singles): bbox 가 있으면 그 안에 있는 칸만 (같은 화면이면 지난 결과를 그대로)
+    def query(self, zoom, bbox=None):
+        key = (zoom, bbox)
+        result = self._queries.get(key)
+        if result is None:
+            result = self._query(zoom, bbox)
+            if len(self._queries) >= QUERY_CACHE_SIZE:
+                self._queries.clear()
+            self._queries[key] = result
+        return result
+
+    def _query(self, zoom, bbox):
+        clusters = []
+        singles = []
+        for members in self._level(zoom).values():
+            points = [self.points[i] for i in members]
+            lats = [p["lat"] for p in points]
+            lngs = [p["lng"] for p in points]
+            lat = sum(lats) / len(lats)
+            lng = sum(lngs) / len(lngs)
+            if bbox is not None:
+                south, west, north, east = bbox
+                if not (south <= lat <= north and west <= lng <= east):
+                    continue
+            if len(points) == 1:
+                singles.append(points[0])
+                continue
+            clusters.append({
+                "lat": lat,
+                "lng": lng,
+                "count": len(points),
+                "south": min(lats), "west": min(lngs), "north": max(lats), "east": max(lngs),
+                "names": [p.get(self.label_key, "") for p in points[:5]],
+            })
+        return clusters, singles
+
+
+# 3. 점 목록별 ClusterIndex 캐시 (세션끼리 공유하므로 돌려받은 결과/점 dict 는 수정하지 않는다)
+# - 키는 점 dict 내용의 hash (json 해시보다 몇 배 빠르다), 찾으면 실제 내용이 같은지 한 번 더 비교
+_indexes = OrderedDict()
+_indexes_lock = threading.Lock()
+
+
+def get_cluster_index(points, cell_px=CELL_PX, label_key="name"):
+    try:
+        key = (hash(tuple(tuple(p.items()) for p in points)), len(points), cell_px, label_key)
+    except TypeError:  # 값에 list 같은 hash 안 되는 것이 있으면 캐시하지 않는다
+        return ClusterIndex(points, cell_px, label_key)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None and index.points == points:
+            _indexes.move_to_end(key)
+            return index
+    index = ClusterIndex(list(points), cell_px, label_key)
+    with _indexes_lock:
+        _indexes[key] = index
+        while len(_indexes) > INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+    return index
+
+
+def cluster_points(points, zoom, bbox=None, cell_px=CELL_PX, label_key="name"):
+    return get_cluster_index(points, cell_px, label_key).query(zoom, bbox)
+
+
+# 화면 bbox 를 상하좌우로 margin 배 만큼 넓히기 (조금 끌어서 움직여도 보이도록)
+def expand_bbox(bbox, margin=1.0):
+    south, west, north, east = bbox
+    dlat = (north - south) * margin
+    dlng = (east - west) * margin
+    return south - dlat, west - dlng, north + dlat, east + dlng
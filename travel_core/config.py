@@ -0,0 +1,55 @@
+# 공용 설정: 캐시/데이터 경로와 API 키 조회
+# - 경로는 저장소 루트 기준 (.cache/, data/), TRAVEL_CACHE_DIR 로 캐시 위치를 바꿀 수 있다
+# - API 키는 import 할 때가 아니라 처음 쓸 때 읽는다: 스트림릿 Secrets -> .env / 환경변수 순서
+# - streamlit 은 이미 올라와 있을 때만 Secrets 를 확인한다 (배치 작업에서 streamlit 을 import 하지 않도록)
+import os
+import sys
+import threading
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+CACHE_DIR = os.getenv("TRAVEL_CACHE_DIR", os.path.join(BASE_DIR, ".cache"))
+
+_secrets = {}
+_dotenv_loaded = False
+_dotenv_lock = threading.Lock()
+
+
+def _load_dotenv():
+    global _dotenv_loaded
+    if _dotenv_loaded:
+        return
+    with _dotenv_lock:
+        if not _dotenv_loaded:
+            try:
+                from dotenv import load_dotenv
+            except ImportError:  # python-dotenv 없이도 환경변수는 그대로 읽는다
+                pass
+            else:
+                load_dotenv()
+            _dotenv_loaded = True
+
+
+def _streamlit_secret(name):
+    st = sys.modules.get("streamlit")
+    if st is None:
+        return None
+    try:
+        return st.secrets[name]
+    except Exception:  # secrets.toml 이 없거나 키가 없으면 환경변수로
+        return None
+
+
+# 찾은 값만 기억해 둔다 (없으면 다음 호출에서 다시 찾음)
+def get_secret(name, default=None):
+    value = _secrets.get(name)
+    if value is not None:
+        return value
+    value = _streamlit_secret(name)
+    if value is None:
+        _load_dotenv()
+        value = os.getenv(name)
+    if value is None:
+        return default
+    _secrets[name] = value
+    return value
@@ -0,0 +1,144 @@
+# 디스크(SQLite) API 응답 캐시 - 여러 프로세스/재시작 사이에서 공유
+# - 응답 본문 + 저장 시각 + 만료 시각 + ETag 를 저장 (만료된 항목도 업스트림 장애 때 쓰려고 바로 지우지 않음)
+# - WAL 모드 + busy_timeout 으로 여러 레플리카가 같은 파일을 동시에 읽고 써도 안전
+# - 전체 크기가 max_bytes 를 넘으면 가장 오래 안 쓴 항목부터 지운다
+import os
+import sqlite3
+import threading
+import time
+
+from .config import CACHE_DIR
+
+DISK_CACHE_PATH = os.path.join(CACHE_DIR, "responses.sqlite3")
+DISK_CACHE_BYTES = int(os.getenv("DISK_CACHE_BYTES", 64 * 1024 * 1024))
+DISK_CACHE_ENABLED = os.getenv("DISK_CACHE_ENABLED", "1") != "0"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    etag TEXT,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses(accessed_at);
+"""
+
+# 마지막 사용 시각은 이 간격(초)보다 오래됐을 때만 갱신 (읽을 때마다 쓰기 방지)
+TOUCH_INTERVAL = 60
+# 몇 번 쓸 때마다 크기 검사를 할지
+EVICT_CHECK_EVERY = 20
+
+
+class CachedResponse:
+    __slots__ = ("body", "etag", "stored_at", "expires_at")
+
+    def __init__(self, body, etag, stored_at, expires_at):
+        self.body = body
+        self.etag = etag
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+
+    @property
+    def fresh(self):
+        return time.time() < self.expires_at
+
+
+class DiskCache:
+    def __init__(self, path=DISK_CACHE_PATH, max_bytes=DISK_CACHE_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn().executescript(SCHEMA)
+
+    # 스레드마다 커넥션 하나 (sqlite3 커넥션은 스레드끼리 공유하지 않는다)
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    # 1. 조회 (만료 여부와 상관없이 있으면 돌려준다 - fresh 로 확인)
+    def get(self, key):
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT body, etag, stored_at, expires_at, accessed_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        now = time.time()
+        if now - row[4] > TOUCH_INTERVAL:
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return CachedResponse(row[0], row[1], row[2], row[3])
+
+    # 2. 저장
+    def set(self, key, body, ttl, etag=None):
+        now = time.time()
+        self._conn().execute(
+            "INSERT OR REPLACE INTO responses (key, body, etag, stored_at, expires_at, accessed_at, size) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, body, etag, now, now + ttl, now, len(body)),
+        )
+        with self._writes_lock:
+            self._writes += 1
+            check = self._writes % EVICT_CHECK_EVERY == 0
+        if check:
+            self.evict()
+
+    # 3. 304 Not Modified: 본문은 그대로 두고 만료 시각만 연장
+    def touch(self, key, ttl):
+        now = time.time()
+        self._conn().execute(
+            "UPDATE responses SET stored_at = ?, expires_at = ?, accessed_at = ? WHERE key = ?",
+            (now, now + ttl, now, key),
+        )
+
+    # 4. 크기 제한: 넘으면 오래 안 쓴 것부터 90% 까지 줄인다
+    def evict(self):
+        conn = self._conn()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        target = int(self.max_bytes * 0.9)
+        removed = 0
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed_at").fetchall():
+                if total <= target:
+                    break
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
+                removed += 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return removed
+
+    def clear(self):
+        self._conn().execute("DELETE FROM responses")
+
+
+_disk_cache = None
+_disk_cache_lock = threading.Lock()
+
+
+# 프로세스 공용 디스크 캐시 (꺼져 있으면 None)
+def get_disk_cache():
+    global _disk_cache
+    if not DISK_CACHE_ENABLED:
+        return None
+    if _disk_cache is None:
+        with _disk_cache_lock:
+            if _disk_cache is None:
+                _disk_cache = DiskCache()
+    return _disk_cache
@@ -0,0 +1,83 @@
+# 거리 계산 (하버사인) - 한 쌍 / 한 점 -> N개 / N x M 행렬
+# - numpy 가 있으면 벡터화해서 계산 (float32 입력은 float32 로, 나머지는 float64)
+# - numpy 가 없으면 순수 파이썬으로 같은 결과(list)를 돌려준다
+import math
+
+# numpy 는 처음 계산할 때 import (import 만으로 시작이 느려지지 않게)
+np = None
+_numpy_checked = False
+
+
+def _load_numpy():
+    global np, _numpy_checked
+    if not _numpy_checked:
+        try:
+            import numpy
+        except ImportError:  # numpy 없이도 동작 (느린 경로)
+            numpy = None
+        np = numpy
+        _numpy_checked = True
+    return np
+
+EARTH_RADIUS_KM = 6371.0
+
+
+# 1. 한 쌍
+def haversine(lat1, lon1, lat2, lon2):
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = math.sin(dlat / 2) ** 2 + math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) * math.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, a)))
+
+
+def _dtype(*arrays):
+    # 입력이 전부 float32 면 float32 로 계산 (메모리/대역폭 절약), 아니면 float64
+    if all(getattr(a, "dtype", None) == np.float32 for a in arrays):
+        return np.float32
+    return np.float64
+
+
+def _haversine_np(lat1, lon1, lat2, lon2, dtype):
+    lat1 = np.radians(lat1, dtype=dtype)
+    lat2 = np.radians(lat2, dtype=dtype)
+    dlat = lat2 - lat1
+    dlon = np.radians(lon2, dtype=dtype) - np.radians(lon1, dtype=dtype)
+    a = np.sin(dlat * 0.5) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon * 0.5) ** 2
+    np.clip(a, 0.0, 1.0, out=a)
+    return (2 * EARTH_RADIUS_KM) * np.arcsin(np.sqrt(a))
+
+
+# 2. 한 점 -> N개 (km)
+def distances_from(lat, lng, lats, lngs):
+    if _load_numpy() is None:
+        return [haversine(lat, lng, la, lo) for la, lo in zip(lats, lngs)]
+    lats = np.asarray(lats)
+    lngs = np.asarray(lngs)
+    dtype = _dtype(lats, lngs)
+    return _haversine_np(dtype(lat), dtype(lng), lats.astype(dtype, copy=False), lngs.astype(dtype, copy=False), dtype)
+
+
+# 3. N x M 거리 행렬 (km). 두 번째 집합을 생략하면 N x N
+def distance_matrix(lats1, lngs1, lats2=None, lngs2=None):
+    if lats2 is None:
+        lats2, lngs2 = lats1, lngs1
+    if _load_numpy() is None:
+        return [[haversine(a, b, c, d) for c, d in zip(lats2, lngs2)] for a, b in zip(lats1, lngs1)]
+    lats1, lngs1 = np.asarray(lats1), np.asarray(lngs1)
+    lats2, lngs2 = np.asarray(lats2), np.asarray(lngs2)
+    dtype = _dtype(lats1, lngs1, lats2, lngs2)
+    return _haversine_np(
+        lats1.astype(dtype, copy=False)[:, None], lngs1.astype(dtype, copy=False)[:, None],
+        lats2.astype(dtype, copy=False)[None, :], lngs2.astype(dtype, copy=False)[None, :],
+        dtype,
+    )
+
+
+# 4. 가까운 순서 (인덱스 순서, 거리 목록) - 검색 결과 정렬용
+def rank_by_distance(lat, lng, lats, lngs):
+    distances = distances_from(lat, lng, lats, lngs)
+    if np is None:
+        order = sorted(range(len(distances)), key=distances.__getitem__)
+        return order, distances
+    order = np.argsort(distances, kind="stable")
+    return order.tolist(), distances.tolist()
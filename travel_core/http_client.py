@@ -0,0 +1,264 @@
+# 외부 API 공용 HTTP 클라이언트
+# - 세션 하나를 프로세스 전체에서 공유 (keep-alive 커넥션 풀)
+# - 엔드포인트별 connect/read 타임아웃, 지터를 준 재시도, 서킷 브레이커
+# - 실패는 UpstreamError 로 올려서 호출하는 쪽이 원인을 알 수 있게 한다
+# - 요청마다 공급자별 속도 제한/일일 한도(rate_limit)를 먼저 확인한다
+# - get_json_cached: 디스크 캐시(disk_cache)를 거쳐서 여러 레플리카/재시작 사이에 응답을 공유
+# - 실제 요청은 upstream.<엔드포인트>, 캐시를 거친 호출은 api.<엔드포인트> span 으로 시간/크기를 기록
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import metrics
+from .disk_cache import get_disk_cache
+from .rate_limit import RateLimitExceeded, get_limiter
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamError(Exception):
+    pass
+
+
+class CircuitOpenError(UpstreamError):
+    pass
+
+
+# 우리 쪽 속도 제한/일일 한도에 걸려서 보내지 않은 요청
+class RateLimitedError(UpstreamError):
+    pass
+
+
+# 4xx (잘못된 키/파라미터 등) - 다시 보내도 같은 결과이고 업스트림 장애도 아니다
+class ClientError(UpstreamError):
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+# 1. 서킷 브레이커: 연속 실패가 쌓이면 reset_timeout 동안 바로 실패 처리
+class CircuitBreaker:
+    def __init__(self, failure_threshold, reset_timeout):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+        self._probe_thread = None
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            # half-open: 시험 요청 하나만 통과
+            if self._probing:
+                return False
+            self._probing = True
+            self._probe_thread = threading.get_ident()
+            return True
+
+    # 시험 요청이 성공/실패 기록 없이 끝났으면 (우리 쪽 속도 제한 등) 다음 요청이 다시 시험할 수 있게 풀어 준다
+    def release_probe(self):
+        with self._lock:
+            if self._probing and self._probe_thread == threading.get_ident():
+                self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return "open"
+            return "half-open"
+
+
+# 2. 엔드포인트 설정
+class Endpoint:
+    def __init__(self, name, connect_timeout=3.05, read_timeout=5.0, retries=2,
+                 backoff=0.3, max_backoff=2.0, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+
+ENDPOINTS = {
+    "openweather": Endpoint("openweather", read_timeout=4.0),
+    "exchangerate": Endpoint("exchangerate", read_timeout=4.0),
+    "naver": Endpoint("naver", read_timeout=3.0),
+}
+
+# 재시도할 만한 응답 코드 (요청 한도 초과 + 서버 오류)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+# 3. 공유 세션 (커넥션 풀)
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=10, pool_maxsize=32)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+def _sleep_backoff(endpoint, attempt):
+    # full jitter: 0 ~ min(max_backoff, backoff * 2^attempt)
+    time.sleep(random.uniform(0, min(endpoint.max_backoff, endpoint.backoff * (2 ** attempt))))
+
+
+# 4. GET 요청 (성공하면 requests.Response, 실패하면 UpstreamError)
+# has_fallback: 캐시된 응답이 있어서 속도 제한에 걸리면 기다리지 않고 바로 실패해도 되는 요청
+def get(endpoint_name, url, params=None, headers=None, has_fallback=False):
+    with metrics.span(f"upstream.{endpoint_name}") as sp:
+        response = _get(endpoint_name, url, params, headers, has_fallback)
+        sp.mark(size=len(response.content))
+        return response
+
+
+def _get(endpoint_name, url, params, headers, has_fallback):
+    endpoint = ENDPOINTS[endpoint_name]
+    breaker = endpoint.breaker
+    if not breaker.allow():
+        raise CircuitOpenError(f"{endpoint.name}: circuit open")
+
+    try:
+        return _attempts(endpoint_name, endpoint, url, params, headers, has_fallback)
+    finally:
+        breaker.release_probe()
+
+
+def _attempts(endpoint_name, endpoint, url, params, headers, has_fallback):
+    breaker = endpoint.breaker
+    session = get_session()
+    limiter = get_limiter()
+    last_error = None
+    for attempt in range(endpoint.retries + 1):
+        if attempt:
+            _sleep_backoff(endpoint, attempt - 1)
+        try:
+            limiter.admit(endpoint_name, has_fallback)
+        except RateLimitExceeded as e:
+            # 업스트림 장애가 아니므로 브레이커에는 반영하지 않는다
+            logger.warning("%s", e)
+            raise RateLimitedError(str(e)) from e
+        try:
+            response = session.get(url, params=params, headers=headers, timeout=endpoint.timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            last_error = e
+            continue
+        except requests.RequestException as e:
+            # 끊긴 응답 본문, 리다이렉트 반복 등은 재시도해도 같으므로 바로 실패 (브레이커에는 반영)
+            breaker.record_failure()
+            logger.warning("%s request failed: %s", endpoint.name, type(e).__name__)
+            raise UpstreamError(f"{endpoint.name}: {type(e).__name__}") from e
+        if response.status_code in RETRY_STATUS:
+            last_error = UpstreamError(f"{endpoint.name}: HTTP {response.status_code}")
+            continue
+        if response.status_code >= 400:
+            # 잘못된 키/파라미터 같은 4xx 는 재시도해도 같으므로 바로 실패 (브레이커에는 반영 안 함)
+            breaker.record_success()
+            raise ClientError(f"{endpoint.name}: HTTP {response.status_code}", response.status_code)
+        breaker.record_success()
+        return response
+
+    breaker.record_failure()
+    # 예외 메시지에는 API 키가 들어간 URL 이 포함될 수 있어 종류만 남긴다
+    reason = type(last_error).__name__ if not isinstance(last_error, UpstreamError) else str(last_error)
+    logger.warning("%s request failed after %d attempts: %s", endpoint.name, endpoint.retries + 1, reason)
+    raise UpstreamError(f"{endpoint.name}: {reason}") from last_error
+
+
+def get_json(endpoint_name, url, params=None, headers=None):
+    response = get(endpoint_name, url, params=params, headers=headers)
+    try:
+        return response.json()
+    except ValueError as e:
+        raise UpstreamError(f"{endpoint_name}: invalid JSON") from e
+
+
+# 5. 디스크 캐시를 거치는 GET (프로세스/재시작 사이 공유)
+# - 만료 전이면 업스트림을 부르지 않고, 만료됐으면 ETag 로 조건부 요청 (304 면 본문 재사용)
+# - 업스트림이 실패하거나(5xx/타임아웃/서킷 열림) 속도 제한/일일 한도에 가까우면 만료된 응답이라도 있으면 그걸 돌려준다
+#   (4xx 는 설정 문제이므로 만료된 응답으로 가리지 않고 그대로 올린다)
+# - max_age(초): 받은 지 이보다 오래된 응답은 만료 전이라도 다시 확인하고, 실패해도 오래된 응답으로 대신하지 않는다
+#   (백그라운드 갱신용 - 디스크에 남은 응답을 새로 받은 것처럼 다시 캐시에 넣지 않도록)
+def _cache_key(endpoint_name, url, params):
+    raw = json.dumps([endpoint_name, url, sorted((params or {}).items())], ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def get_json_cached(endpoint_name, url, params=None, headers=None, ttl=600, max_age=None):
+    with metrics.span(f"api.{endpoint_name}"):
+        return _get_json_cached(endpoint_name, url, params, headers, ttl, max_age)
+
+
+def _get_json_cached(endpoint_name, url, params, headers, ttl, max_age):
+    cache = get_disk_cache()
+    if cache is None:
+        return get_json(endpoint_name, url, params=params, headers=headers)
+
+    key = _cache_key(endpoint_name, url, params)
+    cached = cache.get(key)
+    recent = max_age is None or (cached is not None and time.time() - cached.stored_at <= max_age)
+    if cached is not None and cached.fresh and recent:
+        metrics.mark(hit=True, size=len(cached.body))
+        return json.loads(cached.body)
+    metrics.mark(hit=False)
+
+    request_headers = dict(headers or {})
+    if cached is not None and cached.etag:
+        request_headers["If-None-Match"] = cached.etag
+    try:
+        response = get(endpoint_name, url, params=params, headers=request_headers, has_fallback=cached is not None)
+    except ClientError:
+        # 키가 취소됐거나 요청이 잘못된 경우는 이전 응답으로 가리지 않는다
+        raise
+    except UpstreamError:
+        if cached is not None and max_age is None:
+            logger.info("%s: serving stale cached response", endpoint_name)
+            return json.loads(cached.body)
+        raise
+
+    if response.status_code == 304 and cached is not None:
+        cache.touch(key, ttl)
+        return json.loads(cached.body)
+    try:
+        data = response.json()
+    except ValueError as e:
+        raise UpstreamError(f"{endpoint_name}: invalid JSON") from e
+    cache.set(key, response.content, ttl, etag=response.headers.get("ETag"))
+    return data
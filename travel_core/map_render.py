@@ -0,0 +1,229 @@
+# 지도 HTML 생성 (카카오맵 / folium) + 결과 캐시
+# - 중심/줌/마커/경로를 튜플 키로 묶어서 같은 내용이면 이전에 만든 HTML 을 그대로 돌려준다
+#   (json 직렬화 + 해시는 마커 1000개에서 HTML 을 새로 만드는 것만큼 느려서 쓰지 않는다)
+# - folium 은 만들 때마다 요소 id 가 랜덤이라 HTML 이 매번 달라지고, 그러면 iframe 이 SDK/타일을 처음부터 다시 불러온다.
+#   캐시된 HTML 은 바이트 단위로 같으므로 브라우저가 기존 iframe 을 그대로 둔다.
+# - 캐시는 전체 HTML 크기 기준으로 제한 (가장 오래 안 쓴 것부터 삭제)
+import json
+import math
+import os
+import threading
+from collections import OrderedDict
+
+from . import metrics
+
+MAP_CACHE_BYTES = int(os.getenv("MAP_HTML_CACHE_BYTES", 32 * 1024 * 1024))
+
+
+# 1. 크기 제한 LRU
+class HtmlCache:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            html = self._entries.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def put(self, key, html):
+        size = len(html)
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = html
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, old = self._entries.popitem(last=False)
+                self._bytes -= len(old)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+_cache = HtmlCache(MAP_CACHE_BYTES)
+
+
+def clear_cache():
+    _cache.clear()
+
+
+# 마커/경로처럼 값이 숫자·문자열뿐인 dict 목록은 items() 를 그대로 묶는다 (dict 키 순서는 만든 곳에서 항상 같다)
+def _rows(items):
+    return tuple(map(tuple, map(dict.items, items)))
+
+
+# 클러스터처럼 값에 list 가 섞인 작은 입력용
+def _freeze(value):
+    if isinstance(value, dict):
+        return tuple((k, _freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+def _memoized(key, build):
+    html = _cache.get(key)
+    metrics.mark(hit=html is not None)
+    if html is None:
+        html = build()
+        _cache.put(key, html)
+    metrics.mark(size=len(html))
+    return html
+
+
+# 2. 카카오맵 (CSP 적용으로 HTTP 차단 방지)
+KAKAO_TEMPLATE = """
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <meta http-equiv="Content-Security-Policy" content="upgrade-insecure-requests">
+    <title>Kakao Map</title>
+    <script type="text/javascript" src="https://dapi.kakao.com/v2/maps/sdk.js?appkey={kakao_api_key}"></script>
+    <style>
+        html, body {{ margin: 0; padding: 0; height: 100%; }}
+        #map {{ width: 100%; height: 500px; border-radius: 10px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); }}
+    </style>
+</head>
+<body>
+    <div id="map"></div>
+    <script>
+        var container = document.getElementById('map');
+        var options = {{ center: new kakao.maps.LatLng({center_lat}, {center_lng}), level: {level} }};
+        var map = new kakao.maps.Map(container, options);
+        var markers = {markers_json};
+        var path = {path_json};
+        var clusters = {clusters_json};
+        var linePath = [];
+
+        path.forEach(function(p) {{ linePath.push(new kakao.maps.LatLng(p.lat, p.lng)); }});
+
+        markers.forEach(function(m) {{
+            var position = new kakao.maps.LatLng(m.lat, m.lng);
+            
+            // 이미지 교체: 튼튼한 GitHub 호스팅 이미지
+            var imageSrc = m.type === 'Food' ? 
+                "https://raw.githubusercontent.com/pointhi/leaflet-color-markers/master/img/marker-icon-blue.png" : 
+                "https://raw.githubusercontent.com/pointhi/leaflet-color-markers/master/img/marker-icon-gold.png";
+            
+            var markerImage = new kakao.maps.MarkerImage(imageSrc, new kakao.maps.Size(25, 41)); 
+            var marker = new kakao.maps.Marker({{ map: map, position: position, title: m.name, image: markerImage }});
+            var infowindow = new kakao.maps.InfoWindow({{ content: '<div style="padding:5px;font-size:12px;">' + m.name + '</div>' }});
+            kakao.maps.event.addListener(marker, 'mouseover', function() {{ infowindow.open(map, marker); }});
+            kakao.maps.event.addListener(marker, 'mouseout', function() {{ infowindow.close(); }});
+        }});
+
+        // 서버에서 묶은 클러스터: 개수 말풍선, 클릭하면 그 범위로 확대
+        clusters.forEach(function(c) {{
+            var size = Math.min(56, 28 + Math.round(Math.log(c.count) * 5));
+            var el = document.createElement('div');
+            el.style.cssText = 'width:' + size + 'px;height:' + size + 'px;line-height:' + size + 'px;border-radius:50%;' +
+                'background:rgba(255,75,75,0.85);color:#fff;font:bold 12px sans-serif;text-align:center;cursor:pointer;' +
+                'box-shadow:0 2px 4px rgba(0,0,0,0.3);';
+            el.textContent = c.count;
+            el.title = c.names.join('\\n') + (c.count > c.names.length ? '\\n…' : '');
+            el.onclick = function() {{
+                map.setBounds(new kakao.maps.LatLngBounds(
+                    new kakao.maps.LatLng(c.south, c.west), new kakao.maps.LatLng(c.north, c.east)));
+            }};
+            new kakao.maps.CustomOverlay({{ map: map, position: new kakao.maps.LatLng(c.lat, c.lng), content: el, xAnchor: 0.5, yAnchor: 0.5 }});
+        }});
+
+        if (linePath.length > 1) {{
+            new kakao.maps.Polyline({{
+                path: linePath, strokeWeight: 5, strokeColor: '#FF0000', strokeOpacity: 0.8, strokeStyle: 'solid'
+            }}).setMap(map);
+            var bounds = new kakao.maps.LatLngBounds();
+            linePath.forEach(function(coords) {{ bounds.extend(coords); }});
+            map.setBounds(bounds);
+        }}
+    </script>
+</body>
+</html>
+"""
+
+
+# path 를 생략하면 마커 순서대로 경로를 그린다. clusters 는 clustering.cluster_points 결과
+def kakao_map_html(kakao_api_key, center_lat, center_lng, markers, path=None, clusters=(), level=7):
+    if path is None:
+        path = [{"lat": m["lat"], "lng": m["lng"]} for m in markers]
+    clusters = list(clusters)
+    with metrics.span("render.kakao_html"):
+        key = ("kakao", kakao_api_key, center_lat, center_lng, level, _rows(markers), _rows(path), _freeze(clusters))
+        return _memoized(key, lambda: KAKAO_TEMPLATE.format(
+            kakao_api_key=kakao_api_key,
+            center_lat=center_lat,
+            center_lng=center_lng,
+            level=level,
+            markers_json=json.dumps(markers),
+            path_json=json.dumps(path),
+            clusters_json=json.dumps(clusters),
+        ))
+
+
+# 3. folium (네이버 검색 결과 지도). folium 은 무거우므로 실제로 만들 때만 import
+def folium_map_html(center, zoom, places, user_location=None, clusters=()):
+    places = [
+        {"title": p["title"], "address": p["address"], "lat": p["lat"], "lng": p["lng"], "rank": p.get("rank")}
+        for p in places
+    ]
+    clusters = list(clusters)
+    with metrics.span("render.folium_html"):
+        key = ("folium", _freeze(center), zoom, _rows(places), _freeze(user_location), _freeze(clusters))
+        return _memoized(key, lambda: _build_folium(center, zoom, places, user_location, clusters))
+
+
+def _build_folium(center, zoom, places, user_location, clusters):
+    import folium
+
+    m = folium.Map(location=center, zoom_start=zoom)
+
+    # 내 위치 마커
+    if user_location:
+        folium.Marker(
+            [user_location["lat"], user_location["lng"]],
+            popup="📍 내 위치",
+            icon=folium.Icon(color="blue", icon="info-sign")
+        ).add_to(m)
+
+    # 검색 결과 마커
+    for idx, place in enumerate(places, 1):
+        popup_text = f"<b>{place['rank'] or idx}. {place['title']}</b><br>{place['address']}"
+        folium.Marker(
+            [place["lat"], place["lng"]],
+            popup=folium.Popup(popup_text, max_width=200),
+            icon=folium.Icon(color="red")
+        ).add_to(m)
+
+    # 클러스터 마커 (개수 말풍선 + 포함된 장소 일부)
+    for c in clusters:
+        size = min(56, 28 + round(math.log(c["count"]) * 5))
+        names = "<br>".join(c["names"]) + ("<br>…" if c["count"] > len(c["names"]) else "")
+        folium.Marker(
+            [c["lat"], c["lng"]],
+            popup=folium.Popup(f"<b>{c['count']}곳</b><br>{names}", max_width=220),
+            icon=folium.DivIcon(
+                icon_size=(size, size),
+                icon_anchor=(size // 2, size // 2),
+                html=(
+                    f'<div style="width:{size}px;height:{size}px;line-height:{size}px;border-radius:50%;'
+                    f'background:rgba(255,75,75,0.85);color:#fff;font:bold 12px sans-serif;text-align:center;">'
+                    f'{c["count"]}</div>'
+                ),
+            ),
+        ).add_to(m)
+
+    # Folium 지도를 HTML 문자열로 변환
+    return m._repr_html_()
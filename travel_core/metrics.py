@@ -0,0 +1,300 @@
+# 단계별 시간 측정 (span) + 히스토그램 + 내보내기
+# - with span("kakao.weather") as sp: ... 처럼 감싸면 걸린 시간, 캐시 적중 여부, 응답 크기를 기록한다
+# - 이름별로 히스토그램에 모아서 Prometheus 텍스트 형식(/metrics)이나 주기적인 로그로 내보낸다
+# - 같은 스레드의 span 은 중첩되고, 이번 rerun 에서 기록된 span 목록은 사이드바 디버그 패널에서 본다
+# - METRICS_ENABLED=0 이면 span() 은 아무것도 하지 않는 공용 객체를 돌려준다 (운영에서 켜 둬도 부담 없음)
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+# 설정하면 이 포트에서 /metrics 제공 (예: 9108)
+METRICS_PORT = os.getenv("METRICS_PORT")
+# 설정하면 이 간격(초)마다 요약을 로그로 남긴다
+METRICS_LOG_INTERVAL = float(os.getenv("METRICS_LOG_INTERVAL", 0))
+# 1 이면 모든 세션의 사이드바에 디버그 패널 표시 (아니면 ?debug=1 로 연 페이지에서만)
+METRICS_DEBUG_PANEL = os.getenv("METRICS_DEBUG_PANEL", "0") == "1"
+
+# 히스토그램 구간 (ms)
+BUCKETS_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+# rerun 하나에 보관할 span 최대 개수 (깊은 검색처럼 많이 생겨도 메모리가 늘지 않게)
+TRACE_MAX_SPANS = 200
+
+
+# 1. 히스토그램 (잠금은 레지스트리가 잡는다)
+class Histogram:
+    __slots__ = ("counts", "count", "sum", "hits", "misses", "bytes")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)  # 마지막 칸은 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+
+    def observe(self, ms, hit=None, size=None):
+        i = 0
+        while i < len(BUCKETS_MS) and ms > BUCKETS_MS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += ms
+        if hit is True:
+            self.hits += 1
+        elif hit is False:
+            self.misses += 1
+        if size:
+            self.bytes += size
+
+    # 구간 경계로 어림한 분위수 (ms)
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= target:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else float("inf")
+        return float("inf")
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+_local = threading.local()
+
+
+def _record(span):
+    with _histograms_lock:
+        hist = _histograms.get(span.name)
+        if hist is None:
+            hist = _histograms[span.name] = Histogram()
+        hist.observe(span.duration_ms, span.hit, span.size)
+
+
+# 2. span
+class Span:
+    __slots__ = ("name", "hit", "size", "depth", "started", "duration_ms")
+
+    def __init__(self, name):
+        self.name = name
+        self.hit = None
+        self.size = None
+        self.depth = 0
+        self.started = 0.0
+        self.duration_ms = 0.0
+
+    # hit: 캐시 적중 여부 (처음 정해진 값 유지), size: 응답/HTML 크기(bytes)
+    def mark(self, hit=None, size=None):
+        if hit is not None and self.hit is None:
+            self.hit = hit
+        if size is not None:
+            self.size = size
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.depth = len(stack)
+        stack.append(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration_ms = (time.perf_counter() - self.started) * 1000
+        _local.stack.pop()
+        _record(self)
+        trace = getattr(_local, "trace", None)
+        if trace is not None and len(trace) < TRACE_MAX_SPANS:
+            trace.append(self)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def mark(self, hit=None, size=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(name):
+    if not METRICS_ENABLED:
+        return _NOOP
+    return Span(name)
+
+
+# 지금 열려 있는 가장 안쪽 span 에 표시 (캐시 모듈에서 호출, span 이 없으면 무시)
+def mark(hit=None, size=None):
+    stack = getattr(_local, "stack", None)
+    if stack:
+        stack[-1].mark(hit, size)
+
+
+# 3. rerun 단위 기록 (스크립트 맨 위에서 start_rerun, 맨 아래에서 finish_rerun)
+def start_rerun(script):
+    if not METRICS_ENABLED:
+        return
+    _local.trace = []
+    _local.rerun = (script, time.perf_counter())
+
+
+def finish_rerun():
+    rerun = getattr(_local, "rerun", None)
+    if rerun is None:
+        return
+    _local.rerun = None
+    root = Span(f"{rerun[0]}.rerun")
+    root.started = rerun[1]
+    root.duration_ms = (time.perf_counter() - rerun[1]) * 1000
+    _record(root)
+
+
+# 이번 rerun 에서 끝난 span 들 (시작한 순서)
+def current_trace():
+    return sorted(getattr(_local, "trace", None) or (), key=lambda s: s.started)
+
+
+def snapshot():
+    with _histograms_lock:
+        return {
+            name: {
+                "count": h.count, "sum_ms": h.sum, "hits": h.hits, "misses": h.misses, "bytes": h.bytes,
+                "p50_ms": h.quantile(0.5), "p95_ms": h.quantile(0.95), "buckets": list(h.counts),
+            }
+            for name, h in _histograms.items()
+        }
+
+
+def reset():
+    with _histograms_lock:
+        _histograms.clear()
+
+
+# 4. 내보내기: Prometheus 텍스트 형식
+def render_prometheus():
+    lines = [
+        "# HELP travel_span_duration_ms Stage and upstream call duration in milliseconds",
+        "# TYPE travel_span_duration_ms histogram",
+    ]
+    cache_lines = [
+        "# HELP travel_span_cache_total Cache hits and misses seen inside a span",
+        "# TYPE travel_span_cache_total counter",
+    ]
+    bytes_lines = [
+        "# HELP travel_span_payload_bytes_total Payload bytes produced or received by a span",
+        "# TYPE travel_span_payload_bytes_total counter",
+    ]
+    for name, h in sorted(snapshot().items()):
+        cumulative = 0
+        for le, n in zip(list(BUCKETS_MS) + ["+Inf"], h["buckets"]):
+            cumulative += n
+            lines.append(f'travel_span_duration_ms_bucket{{span="{name}",le="{le}"}} {cumulative}')
+        lines.append(f'travel_span_duration_ms_sum{{span="{name}"}} {h["sum_ms"]:.3f}')
+        lines.append(f'travel_span_duration_ms_count{{span="{name}"}} {h["count"]}')
+        if h["hits"] or h["misses"]:
+            cache_lines.append(f'travel_span_cache_total{{span="{name}",result="hit"}} {h["hits"]}')
+            cache_lines.append(f'travel_span_cache_total{{span="{name}",result="miss"}} {h["misses"]}')
+        if h["bytes"]:
+            bytes_lines.append(f'travel_span_payload_bytes_total{{span="{name}"}} {h["bytes"]}')
+    return "\n".join(lines + cache_lines + bytes_lines) + "\n"
+
+
+# http.server 는 /metrics 를 켤 때만 import
+def _serve_metrics(port):
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+
+
+def _log_loop(interval):
+    while True:
+        time.sleep(interval)
+        for name, h in sorted(snapshot().items()):
+            logger.info(
+                "span %s count=%d mean=%.1fms p50<=%sms p95<=%sms hits=%d misses=%d bytes=%d",
+                name, h["count"], h["sum_ms"] / h["count"] if h["count"] else 0.0,
+                h["p50_ms"], h["p95_ms"], h["hits"], h["misses"], h["bytes"],
+            )
+
+
+_exporter_started = False
+_exporter_lock = threading.Lock()
+
+
+# /metrics 서버와 로그 출력은 프로세스당 한 번만 시작 (설정이 없으면 아무것도 안 함)
+def start_exporter():
+    global _exporter_started
+    if _exporter_started or not METRICS_ENABLED:
+        return
+    with _exporter_lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+        if METRICS_PORT:
+            try:
+                _serve_metrics(int(METRICS_PORT))
+            except OSError as e:
+                # 같은 포트를 다른 레플리카가 쓰고 있으면 로그만 남기고 넘어간다
+                logger.warning("metrics endpoint not started: %s", e)
+        if METRICS_LOG_INTERVAL > 0:
+            threading.Thread(target=_log_loop, args=(METRICS_LOG_INTERVAL,), name="metrics-log", daemon=True).start()
+
+
+# 5. 사이드바 디버그 패널 (streamlit 은 화면에서 쓸 때만 import)
+def debug_panel():
+    if not METRICS_ENABLED:
+        return
+    import streamlit as st
+
+    if not METRICS_DEBUG_PANEL and st.query_params.get("debug") != "1":
+        return
+    trace = current_trace()
+    with st.sidebar.expander("🐞 Timing (this rerun)", expanded=False):
+        if not trace:
+            st.caption("No spans recorded.")
+            return
+        rows = [
+            {
+                "span": "  " * s.depth + s.name,
+                "ms": round(s.duration_ms, 2),
+                "cache": None if s.hit is None else ("hit" if s.hit else "miss"),
+                "bytes": s.size,
+            }
+            for s in trace
+        ]
+        st.dataframe(rows, hide_index=True)
+        totals = snapshot()
+        slowest = sorted(totals.items(), key=lambda kv: -kv[1]["sum_ms"] / max(1, kv[1]["count"]))[:5]
+        st.caption("Process-wide slowest (mean ms): " + ", ".join(
+            f"{name} {h['sum_ms'] / max(1, h['count']):.1f}" for name, h in slowest
+        ))
@@ -0,0 +1,217 @@
+# 네이버 지역 검색 + 전역 결과 캐시
+# - 검색어를 정규화(HTML/공백/대소문자/유니코드)해서 캐시 키로 쓰고, 모든 세션이 같은 캐시를 공유
+# - LRU + TTL 로 오래된/안 쓰는 항목은 버리고, 같은 검색어 동시 요청은 업스트림 호출 한 번으로 합친다
+# - 사용자별 거리 계산/정렬은 캐시 조회 뒤에 하므로 캐시 항목은 사용자와 무관하다
+# - 깊은 검색: 여러 페이지/검색어 변형을 스레드 풀로 동시에 요청해서 합치고 중복 제거
+# - 스트리밍 검색(iter_search): 페이지가 도착할 때마다 지금까지의 결과를 바로 내보낸다
+# - 장소는 Place(__slots__) 로 저장하고, 사용자별 결과(SearchResult)는 공유 Place 참조 + 거리만 가진다
+# - 4xx 로 거절된 페이지는 잠시 기억해서 다시 보내지 않고, 2페이지 이후가 거절되면 깊은 검색 페이지 수를 줄인다
+#   (네이버 지역 검색은 start 를 1 까지만 받는 경우가 있다 - 그러면 검색어 변형만 더 받는다)
+import html
+import logging
+import os
+import re
+import threading
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor, TimeoutError, as_completed, wait
+
+from . import geo, http_client
+from .config import get_secret
+from .places import SESSION_MAX_RESULTS, Place, SearchResult
+from .ttl_cache import named_cache
+
+logger = logging.getLogger(__name__)
+
+# API 주소 (벤치마크/테스트에서는 로컬 스텁 서버로 바꿔서 사용)
+NAVER_API_BASE = os.getenv("NAVER_API_BASE", "https://openapi.naver.com")
+NAVER_LOCAL_URL = f"{NAVER_API_BASE}/v1/search/local.json"
+
+# 검색 결과 캐시 설정 (초 / 항목 수)
+SEARCH_TTL = int(os.getenv("NAVER_SEARCH_CACHE_TTL", 1800))
+SEARCH_MAX_ENTRIES = int(os.getenv("NAVER_SEARCH_CACHE_SIZE", 2048))
+# 4xx 로 거절된 (검색어, 페이지) 를 다시 보내지 않는 시간(초)
+REJECTED_TTL = int(os.getenv("NAVER_SEARCH_REJECTED_TTL", 600))
+
+# 깊은 검색 설정
+PAGE_SIZE = 10
+DEEP_PAGES = int(os.getenv("NAVER_DEEP_PAGES", 3))
+DEEP_VARIANTS = ("맛집", "카페")
+DEEP_DEADLINE = float(os.getenv("NAVER_DEEP_DEADLINE", 2.5))
+FANOUT_WORKERS = int(os.getenv("NAVER_FANOUT_WORKERS", 16))
+
+_TAG_RE = re.compile(r"<[^>]*>")
+
+
+# 1. 검색어 정규화: "<b>명동</b>  맛집" / "명동 맛집 " / 조합형 한글 -> "명동 맛집"
+def normalize_query(query):
+    text = html.unescape(query or "")
+    text = _TAG_RE.sub(" ", text)
+    # NFKC: 전각 문자 -> 반각, 풀어쓴 자모 -> 완성형 한글
+    text = unicodedata.normalize("NFKC", text)
+    return " ".join(text.split()).casefold()
+
+
+def strip_tags(text):
+    return html.unescape(_TAG_RE.sub("", text or ""))
+
+
+def search_cache():
+    return named_cache("naver_search", SEARCH_TTL, max_entries=SEARCH_MAX_ENTRIES)
+
+
+def rejected_cache():
+    return named_cache("naver_search_rejected", REJECTED_TTL, max_entries=SEARCH_MAX_ENTRIES)
+
+
+# 2. 업스트림 호출 + 파싱 (거리 없음, 실패하면 None -> 캐시에 저장 안 함)
+def _request_places(query, start=1):
+    headers = {
+        "X-Naver-Client-Id": get_secret("NAVER_CLIENT_ID"),
+        "X-Naver-Client-Secret": get_secret("NAVER_CLIENT_SECRET"),
+    }
+    params = {"query": query, "display": PAGE_SIZE, "start": start, "sort": "random"}
+    try:
+        data = http_client.get_json_cached("naver", NAVER_LOCAL_URL, params=params, headers=headers, ttl=SEARCH_TTL)
+    except http_client.ClientError as e:
+        rejected_cache().put((query, start), e.status)
+        if start > 1:
+            _limit_pages(start)
+        return None
+    except http_client.UpstreamError:
+        return None
+
+    return parse_places(data)
+
+
+# 응답 JSON -> 장소 목록 (mapx/mapy 는 경도/위도 x 10^7)
+def parse_places(data):
+    places = []
+    for item in data.get("items", []):
+        lng = int(item.get("mapx", 0)) / 10000000.0
+        lat = int(item.get("mapy", 0)) / 10000000.0
+        if lat > 0 and lng > 0:
+            places.append(Place(
+                strip_tags(item.get("title", "")),
+                item.get("roadAddress", "") or item.get("address", ""),
+                item.get("category", ""),
+                lat,
+                lng,
+            ))
+    # 캐시에 들어가는 값은 여러 세션이 같이 보므로 tuple 로 (수정 방지)
+    return tuple(places)
+
+
+def fetch_places(query, start=1):
+    return lookup_places(query, start) or ()
+
+
+# 실패하면 None (결과 없음 () 과 구분해야 하는 배치 조회용)
+def lookup_places(query, start=1):
+    key = normalize_query(query)
+    if not key:
+        return ()
+    if rejected_cache().peek((key, start)) is not None:
+        return None
+    return search_cache().get((key, start), lambda: _request_places(key, start))
+
+
+# 3. 깊은 검색 (페이지 x 검색어 변형 동시 요청 -> 합치기/중복 제거/순위)
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=FANOUT_WORKERS, thread_name_prefix="naver-fanout")
+    return _executor
+
+
+# API 가 실제로 주는 페이지 수 (start 가 거절되면 그 앞 페이지까지로 줄인다)
+_page_limit = DEEP_PAGES
+
+
+def _limit_pages(rejected_start):
+    global _page_limit
+    pages = max(1, (rejected_start - 1) // PAGE_SIZE)
+    if pages < _page_limit:
+        _page_limit = pages
+        logger.info("naver rejected start=%d, deep search now uses %d page(s)", rejected_start, pages)
+
+
+def _dedupe_key(place):
+    return ("".join(normalize_query(place.title).split()), round(place.lat, 4), round(place.lng, 4))
+
+
+def _submit_pages(query, pages, variants):
+    base = normalize_query(query)
+    if not base:
+        return []
+    queries = [base] + [f"{base} {v}" for v in variants if v not in base.split()]
+    jobs = [(q, 1 + page * PAGE_SIZE) for q in queries for page in range(min(pages, _page_limit))]
+    executor = _get_executor()
+    return [executor.submit(fetch_places, q, start) for q, start in jobs]
+
+
+def deep_search(query, pages=DEEP_PAGES, variants=DEEP_VARIANTS, deadline=DEEP_DEADLINE):
+    futures = _submit_pages(query, pages, variants)
+    # 마감 시간 안에 끝난 페이지만 사용 (늦은 요청은 계속 돌아서 캐시만 채운다)
+    wait(futures, timeout=deadline)
+    return merge_pages(f.result() for f in futures if f.done() and not f.exception())
+
+
+# 여러 페이지 결과 합치기: 여러 번 나온 장소가 먼저, 같으면 먼저 나온 순서
+def merge_pages(pages):
+    merged = {}
+    for page in pages:
+        for rank, place in enumerate(page):
+            key = _dedupe_key(place)
+            entry = merged.get(key)
+            if entry is None:
+                merged[key] = [place, 1, len(merged), rank]
+            else:
+                entry[1] += 1
+                entry[3] = min(entry[3], rank)
+    ordered = sorted(merged.values(), key=lambda e: (-e[1], e[3], e[2]))
+    return tuple(e[0] for e in ordered)
+
+
+# 4. 캐시된 결과 + 사용자 위치 기준 거리/정렬 (Place 는 복사하지 않고 순서와 거리만 따로, 최대 limit 개)
+def rank_for_user(places, user_lat=None, user_lng=None, limit=SESSION_MAX_RESULTS):
+    if not (user_lat and user_lng and places):
+        return SearchResult(places, limit=limit)
+    order, distances = geo.rank_by_distance(
+        user_lat, user_lng, [p.lat for p in places], [p.lng for p in places]
+    )
+    if limit:
+        order = order[:limit]
+    return SearchResult([places[i] for i in order], [distances[i] for i in order], limit=limit)
+
+
+def search_places(query, user_lat=None, user_lng=None, deep=False, limit=SESSION_MAX_RESULTS):
+    places = deep_search(query) if deep else fetch_places(query)
+    return rank_for_user(places, user_lat, user_lng, limit)
+
+
+# 5. 스트리밍 검색: 페이지가 끝날 때마다 (지금까지 합친 결과, 남은 페이지 수) 를 내보낸다
+def iter_search(query, user_lat=None, user_lng=None, deep=False, deadline=DEEP_DEADLINE, limit=SESSION_MAX_RESULTS):
+    if not deep:
+        yield search_places(query, user_lat, user_lng, limit=limit), 0
+        return
+    futures = _submit_pages(query, DEEP_PAGES, DEEP_VARIANTS)
+    # 제출 순서대로 합쳐야 순위가 흔들리지 않으므로 끝난 페이지를 자리 그대로 모아 둔다
+    finished = [None] * len(futures)
+    position = {f: i for i, f in enumerate(futures)}
+    remaining = len(futures)
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            remaining -= 1
+            if future.exception() is not None or not future.result():
+                continue
+            finished[position[future]] = future.result()
+            merged = merge_pages(page for page in finished if page)
+            yield rank_for_user(merged, user_lat, user_lng, limit), remaining
+    except TimeoutError:
+        pass  # 마감 시간이 지나면 지금까지 받은 결과로 끝낸다
@@ -0,0 +1,58 @@
+# 검색 결과 장소 레코드 (메모리 절약형)
+# - Place: __slots__ 객체 (dict 보다 훨씬 작다), 카테고리 문자열은 intern 해서 같은 값은 한 번만 저장
+# - 캐시에 들어간 Place 는 모든 세션이 같은 객체를 공유하므로 수정하지 않는다
+# - SearchResult: 세션이 들고 있는 검색 결과. 공유 Place 참조 + 이 사용자 기준 거리만 가지고, 최대 개수를 둔다
+import os
+import sys
+from array import array
+
+# 세션 하나가 들고 있는 검색 결과 최대 개수
+SESSION_MAX_RESULTS = int(os.getenv("SESSION_MAX_RESULTS", 100))
+# 검색해서 받은 장소를 세션 공유 색인(주변 장소 공간 인덱스 등)에 남겨 두는 최대 개수
+SHARED_MAX_PLACES = int(os.getenv("SHARED_MAX_PLACES", 5000))
+
+
+class Place:
+    __slots__ = ("title", "address", "category", "lat", "lng")
+
+    def __init__(self, title, address, category, lat, lng):
+        self.title = title
+        self.address = address
+        self.category = sys.intern(category)
+        self.lat = lat
+        self.lng = lng
+
+    def as_dict(self):
+        return {"title": self.title, "address": self.address, "category": self.category, "lat": self.lat, "lng": self.lng}
+
+    def __repr__(self):
+        return f"Place({self.title!r}, {self.lat:.6f}, {self.lng:.6f})"
+
+
+class SearchResult:
+    __slots__ = ("places", "distances")
+
+    # places: 공유 Place 튜플 (순위 순서), distances: 같은 순서의 거리(km) 또는 None (위치 모름)
+    def __init__(self, places=(), distances=None, limit=SESSION_MAX_RESULTS):
+        self.places = tuple(places[:limit]) if limit else tuple(places)
+        self.distances = array("d", distances[:len(self.places)]) if distances is not None else None
+
+    def __len__(self):
+        return len(self.places)
+
+    def __iter__(self):
+        return iter(self.places)
+
+    def __getitem__(self, i):
+        return self.places[i]
+
+    def distance(self, i):
+        return self.distances[i] if self.distances is not None else None
+
+    # (순위, 장소, 거리) - 순위는 1부터
+    def ranked(self):
+        for i, place in enumerate(self.places):
+            yield i + 1, place, self.distance(i)
+
+
+EMPTY_RESULT = SearchResult()
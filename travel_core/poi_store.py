@@ -0,0 +1,194 @@
+# 관광지/맛집(POI) 저장소
+# - 원본은 data/city_data.json, 실행 시 SQLite 파일로 한 번 변환해서 사용 (원본이 바뀌면 다시 생성)
+# - 프로세스당 하나만 열고, 도시/타입/평점 인덱스로 필요한 행만 조회한다
+# - 선택한 도시의 데이터만 불러오고 최근에 쓴 도시 몇 개만 메모리에 둔다
+import functools
+import json
+import os
+import sqlite3
+import threading
+
+from .config import CACHE_DIR, DATA_DIR
+from .spatial_index import GridIndex
+
+SOURCE_PATH = os.path.join(DATA_DIR, "city_data.json")
+DB_PATH = os.path.join(CACHE_DIR, "pois.sqlite3")
+
+SCHEMA = """
+CREATE TABLE cities (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    lat REAL NOT NULL,
+    lng REAL NOT NULL
+);
+CREATE TABLE pois (
+    id INTEGER PRIMARY KEY,
+    city_id INTEGER NOT NULL REFERENCES cities(id),
+    kind TEXT NOT NULL,          -- 'spot' | 'food'
+    name TEXT NOT NULL,
+    lat REAL NOT NULL,
+    lng REAL NOT NULL,
+    type TEXT NOT NULL,
+    rating REAL
+);
+CREATE INDEX idx_pois_city ON pois(city_id, kind);
+CREATE INDEX idx_pois_type ON pois(type, city_id);
+CREATE INDEX idx_pois_rating ON pois(rating DESC);
+"""
+
+
+# 1. JSON -> SQLite 변환 (임시 파일에 만든 뒤 교체해서 다른 프로세스가 반쯤 만든 파일을 읽지 않게)
+def build_db(source_path=SOURCE_PATH, db_path=DB_PATH):
+    with open(source_path, encoding="utf-8") as f:
+        city_data = json.load(f)
+
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    tmp_path = f"{db_path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(SCHEMA)
+        for name, city in city_data.items():
+            cur = conn.execute(
+                "INSERT INTO cities (name, lat, lng) VALUES (?, ?, ?)", (name, city["lat"], city["lng"])
+            )
+            city_id = cur.lastrowid
+            for kind, key in (("spot", "spots"), ("food", "food")):
+                conn.executemany(
+                    "INSERT INTO pois (city_id, kind, name, lat, lng, type, rating) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(city_id, kind, p["name"], p["lat"], p["lng"], p["type"], p.get("rating")) for p in city.get(key, [])],
+                )
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+
+
+def _needs_build(source_path, db_path):
+    if not os.path.exists(db_path):
+        return True
+    return os.path.getmtime(source_path) > os.path.getmtime(db_path)
+
+
+def _row_to_poi(row):
+    poi = {"name": row["name"], "lat": row["lat"], "lng": row["lng"], "type": row["type"]}
+    if row["rating"] is not None:
+        poi["rating"] = row["rating"]
+    return poi
+
+
+# 2. 조회용 저장소 (읽기 전용, 스레드마다 커넥션 하나)
+class PoiStore:
+    def __init__(self, db_path=DB_PATH, city_cache_size=16):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._city_names = None
+        # 도시 단위 결과는 최근 사용한 몇 개만 메모리에 둔다
+        self.city = functools.lru_cache(maxsize=city_cache_size)(self._load_city)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def city_names(self):
+        if self._city_names is None:
+            rows = self._conn().execute("SELECT name FROM cities ORDER BY id").fetchall()
+            self._city_names = [r["name"] for r in rows]
+        return self._city_names
+
+    # [(도시 이름, lat, lng), ...] (도시별 날씨 prefetch 등)
+    def cities(self):
+        rows = self._conn().execute("SELECT name, lat, lng FROM cities ORDER BY id").fetchall()
+        return [(r["name"], r["lat"], r["lng"]) for r in rows]
+
+    # 선택한 도시 하나만: {"lat", "lng", "spots": [...], "food": [...]} (기존 city_data 와 같은 모양)
+    def _load_city(self, name):
+        conn = self._conn()
+        city = conn.execute("SELECT id, lat, lng FROM cities WHERE name = ?", (name,)).fetchone()
+        if city is None:
+            raise KeyError(name)
+        info = {"lat": city["lat"], "lng": city["lng"], "spots": [], "food": []}
+        rows = conn.execute(
+            "SELECT kind, name, lat, lng, type, rating FROM pois WHERE city_id = ? ORDER BY id", (city["id"],)
+        )
+        for row in rows:
+            info["spots" if row["kind"] == "spot" else "food"].append(_row_to_poi(row))
+        return info
+
+    def by_type(self, poi_type, city=None, limit=None):
+        sql = "SELECT p.name, p.lat, p.lng, p.type, p.rating FROM pois p"
+        args = [poi_type]
+        if city is not None:
+            sql += " JOIN cities c ON c.id = p.city_id WHERE p.type = ? AND c.name = ?"
+            args.append(city)
+        else:
+            sql += " WHERE p.type = ?"
+        sql += " ORDER BY p.id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+        return [_row_to_poi(r) for r in self._conn().execute(sql, args)]
+
+    def top_rated(self, city=None, min_rating=0.0, limit=10):
+        sql = "SELECT p.name, p.lat, p.lng, p.type, p.rating FROM pois p"
+        args = []
+        if city is not None:
+            sql += " JOIN cities c ON c.id = p.city_id WHERE c.name = ? AND p.rating >= ?"
+            args.append(city)
+        else:
+            sql += " WHERE p.rating >= ?"
+        args.append(min_rating)
+        sql += " ORDER BY p.rating DESC, p.id LIMIT ?"
+        args.append(limit)
+        return [_row_to_poi(r) for r in self._conn().execute(sql, args)]
+
+    # 전체 POI 를 한 줄씩 (색인 생성 같은 일괄 작업용, 메모리에 한 번에 올리지 않는다)
+    def iter_pois(self):
+        rows = self._conn().execute(
+            "SELECT p.id, c.name AS city, p.kind, p.name, p.lat, p.lng, p.type, p.rating "
+            "FROM pois p JOIN cities c ON c.id = p.city_id ORDER BY p.id"
+        )
+        for row in rows:
+            poi = _row_to_poi(row)
+            poi["id"] = row["id"]
+            poi["city"] = row["city"]
+            poi["kind"] = row["kind"]
+            yield poi
+
+
+# 3. 프로세스 전체에서 공유하는 저장소
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if _needs_build(SOURCE_PATH, DB_PATH):
+                    build_db(SOURCE_PATH, DB_PATH)
+                _store = PoiStore(DB_PATH)
+    return _store
+
+
+# 4. 전체 POI 공간 인덱스 (처음 쓸 때 한 번 생성)
+_poi_index = None
+
+
+def get_poi_index():
+    global _poi_index
+    if _poi_index is None:
+        store = get_store()
+        with _store_lock:
+            if _poi_index is None:
+                index = GridIndex()
+                for poi in store.iter_pois():
+                    index.add(poi["lat"], poi["lng"], poi, key=poi["id"])
+                _poi_index = index
+    return _poi_index
@@ -0,0 +1,190 @@
+# 백그라운드 prefetch 스케줄러 (프로세스당 하나)
+# - 모든 도시의 날씨와 환율을 주기적으로 새로 받아 공유 캐시에 넣어 둔다 -> 화면은 메모리에서만 읽는다
+# - 동시에 도는 작업 수(max_workers)와 공급자별 호출 간격(spacing)을 제한해서 요청 한도를 지킨다
+# - start()/stop() 으로 켜고 끄고, health() 로 밀려 있는 작업이 있는지 확인
+import atexit
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from . import rate_limit, travel_info
+
+logger = logging.getLogger(__name__)
+
+# 공급자별 최소 호출 간격(초): OpenWeather 무료 요금제 분당 60회 -> 여유 있게 1.1초
+PROVIDER_SPACING = {"openweather": 1.1, "exchangerate": 1.0}
+# 일일 한도가 있는 공급자는 prefetch 가 soft 한도의 이 비율까지만 쓰도록 간격을 늘린다 (나머지는 화면 요청 몫)
+QUOTA_SHARE = float(os.getenv("PREFETCH_QUOTA_SHARE", 0.5))
+
+
+# 1. 작업 하나 (every 초마다 fn 실행, fn 은 성공하면 True)
+class Job:
+    def __init__(self, name, provider, fn, every):
+        self.name = name
+        self.provider = provider
+        self.fn = fn
+        self.every = every
+        self.last_attempt = None
+        self.last_success = None
+        self.failures = 0  # 연속 실패 횟수
+
+    def due(self, now):
+        return self.last_attempt is None or now - self.last_attempt >= self.every
+
+
+# 2. 스케줄러
+class PrefetchScheduler:
+    def __init__(self, jobs, tick=5.0, max_workers=2, spacing=None):
+        self.jobs = list(jobs)
+        self.tick = tick
+        self.max_workers = max_workers
+        self.spacing = dict(PROVIDER_SPACING if spacing is None else spacing)
+        self._next_call = {}  # provider -> 다음 호출 가능 시각
+        self._pace_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._executor = None
+        self._last_tick = None
+        self._started_at = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="prefetch")
+        self._thread = threading.Thread(target=self._run, name="prefetch-scheduler", daemon=True)
+        self._started_at = time.monotonic()
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.run_once()
+            self._stop.wait(self.tick)
+
+    # 실행할 때가 된 작업을 한 번씩 돌린다 (동시 실행 수는 executor 크기로 제한)
+    def run_once(self):
+        now = time.monotonic()
+        self._last_tick = now
+        due = [job for job in self.jobs if job.due(now)]
+        if not due:
+            return
+        executor = self._executor
+        if executor is None:
+            for job in due:
+                self._run_job(job)
+            return
+        for future in [executor.submit(self._run_job, job) for job in due]:
+            future.result()
+
+    def _pace(self, provider):
+        # 같은 공급자 호출 사이에 spacing 초 이상 간격을 둔다 (stop 되면 바로 빠져나옴)
+        gap = self.spacing.get(provider, 0)
+        with self._pace_lock:
+            now = time.monotonic()
+            at = max(now, self._next_call.get(provider, now))
+            self._next_call[provider] = at + gap
+        if at > now:
+            self._stop.wait(at - now)
+        return not self._stop.is_set()
+
+    def _run_job(self, job):
+        if not self._pace(job.provider):
+            return
+        job.last_attempt = time.monotonic()
+        try:
+            ok = job.fn()
+        except Exception:
+            logger.exception("prefetch job %s failed", job.name)
+            ok = False
+        if ok:
+            job.last_success = time.monotonic()
+            job.failures = 0
+        else:
+            job.failures += 1
+
+    # 3. 상태: 작업이 주기의 2배 넘게 성공하지 못했으면 behind 로 본다
+    def health(self):
+        now = time.monotonic()
+        behind = []
+        for job in self.jobs:
+            since = job.last_success if job.last_success is not None else self._started_at
+            if since is not None and now - since > 2 * job.every:
+                behind.append(job.name)
+        return {
+            "running": self._thread is not None and self._thread.is_alive(),
+            "jobs": len(self.jobs),
+            "warm": sum(1 for job in self.jobs if job.last_success is not None),
+            "failing": [job.name for job in self.jobs if job.failures],
+            "behind": behind,
+            "last_tick_age": None if self._last_tick is None else now - self._last_tick,
+        }
+
+
+# 4. 여행 정보(도시별 날씨 + 환율) 작업 목록
+# calls 개의 작업이 같은 공급자를 부를 때 하루 한도를 넘지 않는 최소 간격(초). 한도는 레플리카 전체가 공유
+def quota_interval(provider, calls=1):
+    limit = rate_limit.LIMITS.get(provider)
+    if limit is None or not limit.daily:
+        return 0
+    return 86400 * calls / (limit.daily * limit.soft_ratio * QUOTA_SHARE)
+
+
+def travel_jobs(cities, weather_api_key, exchange_api_key, weather_every=None, exchange_every=None):
+    # 캐시가 만료되기 전에 갱신되도록 TTL 의 절반마다, 단 일일 한도 안에 들어가도록
+    weather_every = weather_every or max(
+        travel_info.WEATHER_TTL / 2, quota_interval("openweather", len(cities))
+    )
+    exchange_every = exchange_every or max(travel_info.EXCHANGE_TTL / 2, quota_interval("exchangerate"))
+    jobs = []
+    if weather_api_key:
+        for name, lat, lng in cities:
+            jobs.append(Job(
+                f"weather:{name}", "openweather",
+                lambda lat=lat, lng=lng: travel_info.refresh_weather(lat, lng, weather_api_key, weather_every),
+                weather_every,
+            ))
+    if exchange_api_key:
+        jobs.append(Job(
+            "exchange_rate", "exchangerate",
+            lambda: travel_info.refresh_exchange_rate(exchange_api_key, exchange_every),
+            exchange_every,
+        ))
+    return jobs
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def start_prefetch(cities, weather_api_key, exchange_api_key):
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = PrefetchScheduler(travel_jobs(cities, weather_api_key, exchange_api_key))
+            _scheduler.start()
+            atexit.register(stop_prefetch)
+        return _scheduler
+
+
+def stop_prefetch():
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is not None:
+            _scheduler.stop()
+            _scheduler = None
+
+
+def prefetch_health():
+    scheduler = _scheduler
+    return scheduler.health() if scheduler is not None else {"running": False}
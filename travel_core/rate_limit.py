@@ -0,0 +1,179 @@
+# 공급자별 요청 속도 제한 + 일일 사용량(quota) 집계
+# - 토큰 버킷: 초당 rate 개씩 채워지고 burst 개까지 모아 둘 수 있다 (프로세스 안의 모든 세션이 공유)
+# - 토큰이 없으면 제한된 수(max_waiters)만 deadline 까지 기다리고 나머지는 바로 거절
+# - 일일 사용량은 SQLite 에 기록해서 레플리카/재시작 사이에서도 이어진다 (날짜는 한국 시간 기준)
+# - 한도에 가까워지면(soft_ratio) 캐시된 응답이 있는 요청은 업스트림 대신 캐시를 쓰도록 거절한다
+import os
+import sqlite3
+import threading
+import time
+
+from .config import CACHE_DIR
+
+QUOTA_DB_PATH = os.path.join(CACHE_DIR, "quota.sqlite3")
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") != "0"
+
+KST_OFFSET = 9 * 3600
+
+
+class RateLimitExceeded(Exception):
+    pass
+
+
+class QuotaExceeded(RateLimitExceeded):
+    pass
+
+
+# 1. 공급자별 한도
+class Limit:
+    def __init__(self, rate, burst, daily=None, max_waiters=16, max_wait=2.0, soft_ratio=0.9):
+        self.rate = rate  # 초당 요청 수
+        self.burst = burst
+        self.daily = daily  # 하루 최대 요청 수 (None 이면 제한 없음)
+        self.max_waiters = max_waiters
+        self.max_wait = max_wait
+        self.soft_ratio = soft_ratio
+
+
+def _env_int(name, default):
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+LIMITS = {
+    # 네이버 검색 API: 하루 25,000회
+    "naver": Limit(rate=10.0, burst=10, daily=_env_int("NAVER_DAILY_QUOTA", 25000)),
+    # OpenWeather 무료: 분당 60회 (월 100만 회 -> 하루 약 3만 회)
+    "openweather": Limit(rate=1.0, burst=10, daily=_env_int("OPENWEATHER_DAILY_QUOTA", 30000)),
+    # ExchangeRate-API 무료: 월 1,500회 -> 하루 50회
+    "exchangerate": Limit(rate=0.1, burst=3, daily=_env_int("EXCHANGE_DAILY_QUOTA", 50), max_wait=0.5),
+}
+
+
+# 2. 토큰 버킷
+class TokenBucket:
+    def __init__(self, rate, burst, max_waiters=16):
+        self.rate = rate
+        self.burst = burst
+        self.max_waiters = max_waiters
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._waiters = 0
+        self._cond = threading.Condition(threading.Lock())
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    # timeout 초 안에 토큰을 얻으면 True. 대기열이 꽉 찼거나 시간이 지나면 False
+    def acquire(self, timeout=0.0):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._refill(time.monotonic())
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            if timeout <= 0 or self._waiters >= self.max_waiters:
+                return False
+            self._waiters += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return True
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        return False
+                    self._cond.wait(min(remaining, (1 - self._tokens) / self.rate))
+            finally:
+                self._waiters -= 1
+
+
+# 3. 일일 사용량 (여러 프로세스가 같은 파일에 원자적으로 +1)
+class DailyQuota:
+    def __init__(self, path=QUOTA_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn().execute(
+            "CREATE TABLE IF NOT EXISTS quota (provider TEXT NOT NULL, day TEXT NOT NULL, used INTEGER NOT NULL, "
+            "PRIMARY KEY (provider, day))"
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def today():
+        return time.strftime("%Y-%m-%d", time.gmtime(time.time() + KST_OFFSET))
+
+    def used(self, provider):
+        row = self._conn().execute(
+            "SELECT used FROM quota WHERE provider = ? AND day = ?", (provider, self.today())
+        ).fetchone()
+        return row[0] if row else 0
+
+    # limit 안이면 1 늘리고 True
+    def consume(self, provider, limit):
+        conn = self._conn()
+        day = self.today()
+        conn.execute("INSERT OR IGNORE INTO quota (provider, day, used) VALUES (?, ?, 0)", (provider, day))
+        cur = conn.execute(
+            "UPDATE quota SET used = used + 1 WHERE provider = ? AND day = ? AND used < ?", (provider, day, limit)
+        )
+        return cur.rowcount == 1
+
+
+# 4. 공급자별 버킷 + quota 를 묶은 제한기
+class RateLimiter:
+    def __init__(self, limits=None, quota=None):
+        self.limits = dict(LIMITS if limits is None else limits)
+        self.quota = quota
+        self._buckets = {
+            name: TokenBucket(limit.rate, limit.burst, limit.max_waiters) for name, limit in self.limits.items()
+        }
+
+    # 요청 하나를 보내도 되는지. has_fallback: 캐시된(오래된) 응답이 있어서 거절돼도 괜찮은 요청
+    def admit(self, provider, has_fallback=False):
+        limit = self.limits.get(provider)
+        if limit is None:
+            return
+        if limit.daily and self.quota is not None and has_fallback:
+            if self.quota.used(provider) >= limit.daily * limit.soft_ratio:
+                raise QuotaExceeded(f"{provider}: daily quota nearly used, serving cached data")
+        # 캐시로 대신할 수 있으면 기다리지 않는다
+        if not self._buckets[provider].acquire(0.0 if has_fallback else limit.max_wait):
+            raise RateLimitExceeded(f"{provider}: rate limit")
+        if limit.daily and self.quota is not None and not self.quota.consume(provider, limit.daily):
+            raise QuotaExceeded(f"{provider}: daily quota used up")
+
+    def usage(self, provider):
+        limit = self.limits.get(provider)
+        used = self.quota.used(provider) if self.quota is not None else 0
+        daily = limit.daily if limit else None
+        return {"used": used, "daily": daily, "ratio": used / daily if daily else 0.0}
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                if RATE_LIMIT_ENABLED:
+                    _limiter = RateLimiter(quota=DailyQuota())
+                else:
+                    # 꺼져 있으면 (벤치마크 등) 아무 공급자도 제한하지 않는다
+                    _limiter = RateLimiter(limits={})
+    return _limiter
@@ -0,0 +1,181 @@
+# 방문 순서 자동 최적화 (짧은 경로 찾기)
+# - 최근접 이웃(nearest neighbour)으로 초기 경로를 만들고 2-opt / Or-opt 로 개선
+# - 출발지/도착지 고정 지원, time_budget(초) 안에서만 개선하므로 rerun 을 막지 않는다
+# - 점이 많으면 거리 행렬/최근접 이웃(O(n^2)) 대신 띠 모양 훑기 순서로 시작해서 시간 제한을 지킨다
+import math
+import time
+
+from . import geo
+
+# 이보다 많으면 거리 행렬을 만들지 않는다 (1000개면 행렬만 100ms 이상)
+MATRIX_MAX_POINTS = 400
+
+
+# 1. 거리 행렬 (geo 모듈의 벡터화 하버사인, km). 끝에 가상 노드용 0 행/열 2개를 붙인다
+def _matrix_with_virtual_nodes(points):
+    lats = [p[0] for p in points]
+    lngs = [p[1] for p in points]
+    matrix = geo.distance_matrix(lats, lngs)
+    if not isinstance(matrix, list):
+        matrix = matrix.tolist()  # 파이썬 루프에서는 list 인덱싱이 가장 빠르다
+    size = len(points) + 2
+    for row in matrix:
+        row.extend((0.0, 0.0))
+    matrix.append([0.0] * size)
+    matrix.append([0.0] * size)
+    return matrix
+
+
+def route_length(points, order):
+    return sum(geo.haversine(*points[a], *points[b]) for a, b in zip(order, order[1:]))
+
+
+# 2. 최적화 진입점: points = [(lat, lng), ...], start/end = 고정할 인덱스 (없으면 None)
+def optimize_route(points, start=None, end=None, time_budget=0.05):
+    deadline = time.perf_counter() + time_budget
+    n = len(points)
+    if end == start:
+        end = None
+    if n <= 2:
+        order = list(range(n))
+        if (start is not None and order[0] != start) or (end is not None and order[-1] != end):
+            order.reverse()
+        return order
+
+    # 고정되지 않은 끝은 모든 점과 거리 0인 가상 노드(n, n+1)로 대신한다
+    first = start if start is not None else n
+    last = end if end is not None else n + 1
+    middle = [i for i in range(n) if i != start and i != end]
+    if n > MATRIX_MAX_POINTS:
+        haversine = geo.haversine
+
+        def dist(a, b):
+            if a >= n or b >= n:
+                return 0.0
+            return haversine(*points[a], *points[b])
+
+        path = [first] + _sweep_order(middle, points) + [last]
+    else:
+        matrix = _matrix_with_virtual_nodes(points)
+
+        def dist(a, b):
+            return matrix[a][b]
+
+        path = [first] + _nearest_neighbour(middle, first, dist, deadline, points) + [last]
+
+    while time.perf_counter() < deadline:
+        improved = _two_opt(path, dist, deadline)
+        improved = _or_opt(path, dist, deadline) or improved
+        if not improved:
+            break
+
+    return [i for i in path if i < n]
+
+
+# 3. 초기해
+# 띠 훑기: 위도로 띠를 나누고 띠마다 경도 방향을 번갈아 정렬 (O(n log n), 시간 부족할 때 사용)
+def _sweep_order(nodes, points):
+    if not nodes:
+        return []
+    lats = [points[i][0] for i in nodes]
+    low, high = min(lats), max(lats)
+    strips = max(1, int(math.sqrt(len(nodes) / 2)))
+    height = (high - low) / strips or 1.0
+
+    def key(i):
+        strip = min(strips - 1, int((points[i][0] - low) / height))
+        return strip, points[i][1] if strip % 2 == 0 else -points[i][1]
+
+    return sorted(nodes, key=key)
+
+
+# 최근접 이웃 (마감 시간이 지나면 남은 점은 띠 훑기 순서로 붙인다)
+def _nearest_neighbour(nodes, first, dist, deadline, points):
+    remaining = list(nodes)
+    if not remaining:
+        return []
+    route = []
+    current = first
+    while remaining:
+        if time.perf_counter() > deadline:
+            return route + _sweep_order(remaining, points)
+        best_idx = 0
+        best_d = dist(current, remaining[0])
+        for idx in range(1, len(remaining)):
+            d = dist(current, remaining[idx])
+            if d < best_d:
+                best_d = d
+                best_idx = idx
+        current = remaining[best_idx]
+        # 순서를 유지할 필요가 없으므로 끝 원소와 바꿔서 O(1) 삭제
+        remaining[best_idx] = remaining[-1]
+        remaining.pop()
+        route.append(current)
+    return route
+
+
+# 4. 2-opt: 두 간선을 끊고 구간을 뒤집어서 더 짧아지면 적용 (양 끝 노드는 고정)
+def _two_opt(path, dist, deadline):
+    improved = False
+    last = len(path) - 2
+    for i in range(1, last):
+        if time.perf_counter() > deadline:
+            break
+        a, b = path[i - 1], path[i]
+        d_ab = dist(a, b)
+        for j in range(i + 1, last + 1):
+            c, e = path[j], path[j + 1]
+            # d(a, c) 가 이미 d(a, b) 보다 길면 이 방향으로는 이득이 없다 (반대 방향은 다른 i 에서 검사)
+            # a 가 가상 노드(d_ab == 0)면 가지치기 없이 본다
+            d_ac = dist(a, c)
+            if d_ab > 0.0 and d_ac >= d_ab:
+                continue
+            delta = d_ac + dist(b, e) - d_ab - dist(c, e)
+            if delta < -1e-9:
+                path[i:j + 1] = path[i:j + 1][::-1]
+                improved = True
+                b = path[i]
+                d_ab = dist(a, b)
+    return improved
+
+
+# 5. Or-opt: 1~3개짜리 연속 구간을 다른 위치로 옮기기 (뒤집어 넣기 포함)
+def _or_opt(path, dist, deadline):
+    improved = False
+    for seg_len in (1, 2, 3):
+        i = 1
+        while i + seg_len <= len(path) - 1:
+            if time.perf_counter() > deadline:
+                return improved
+            j = i + seg_len - 1
+            prev, s0, s1, nxt = path[i - 1], path[i], path[j], path[j + 1]
+            removed_gain = dist(prev, s0) + dist(s1, nxt) - dist(prev, nxt)
+            if removed_gain <= 1e-9:
+                i += 1
+                continue
+            best = None
+            best_cost = removed_gain - 1e-9
+            for k in range(len(path) - 1):
+                if i - 1 <= k <= j:
+                    continue
+                x, y = path[k], path[k + 1]
+                d_xy = dist(x, y)
+                cost = dist(x, s0) + dist(s1, y) - d_xy
+                if cost < best_cost:
+                    best_cost, best = cost, (k, False)
+                cost = dist(x, s1) + dist(s0, y) - d_xy
+                if cost < best_cost:
+                    best_cost, best = cost, (k, True)
+            if best is None:
+                i += 1
+                continue
+            k, reverse = best
+            segment = path[i:j + 1]
+            if reverse:
+                segment.reverse()
+            del path[i:j + 1]
+            if k > j:
+                k -= seg_len
+            path[k + 1:k + 1] = segment
+            improved = True
+    return improved
@@ -0,0 +1,238 @@
+# 위경도 격자(grid) 공간 인덱스
+# - 점들을 cell_deg 크기의 격자 칸에 나눠 담고, 질의할 때는 주변 칸만 본다
+# - 반경(radius), k-최근접(nearest), 영역(bbox: 지도 화면 범위) 질의 지원
+# - 추가는 잠금 안에서, 조회는 잠금 없이 (칸 목록에 append 만 하므로 안전)
+import heapq
+import math
+import threading
+
+from . import geo
+
+M_PER_DEG_LAT = 111320.0
+# 먼 곳 질의용 상위 격자: 칸 BLOCK_CELLS x BLOCK_CELLS 개를 한 블록으로 묶는다
+BLOCK_CELLS = 8
+# k-최근접에서 고리로 이만큼 칸을 보고도 못 끝내면 블록 단위 탐색으로 바꾼다
+RING_SCAN_CELLS = 256
+
+
+class GridIndex:
+    def __init__(self, cell_deg=0.005):
+        self.cell_deg = cell_deg
+        self._cells = {}  # (ix, iy) -> [id, ...]
+        self._blocks = {}  # (bx, by) -> [(ix, iy), ...] 채워진 칸
+        self._lats = []
+        self._lngs = []
+        self._coslats = []  # cos(위도) - k-최근접에서 하버사인을 다 계산하기 전에 거르는 용도
+        self._items = []
+        self._keys = {}  # 중복 방지용 key -> id
+        self._bounds = None  # (min_ix, min_iy, max_ix, max_iy)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def _cell(self, lat, lng):
+        return (math.floor(lng / self.cell_deg), math.floor(lat / self.cell_deg))
+
+    # 1. 추가 (key 가 같은 점은 한 번만 들어간다)
+    def add(self, lat, lng, item, key=None):
+        with self._lock:
+            if key is not None and key in self._keys:
+                return self._keys[key]
+            idx = len(self._items)
+            self._lats.append(lat)
+            self._lngs.append(lng)
+            self._coslats.append(math.cos(math.radians(lat)))
+            self._items.append(item)
+            if key is not None:
+                self._keys[key] = idx
+            ix, iy = self._cell(lat, lng)
+            ids = self._cells.get((ix, iy))
+            if ids is None:
+                self._blocks.setdefault((ix // BLOCK_CELLS, iy // BLOCK_CELLS), []).append((ix, iy))
+                ids = self._cells[(ix, iy)] = []
+            ids.append(idx)
+            if self._bounds is None:
+                self._bounds = (ix, iy, ix, iy)
+            else:
+                x0, y0, x1, y1 = self._bounds
+                self._bounds = (min(x0, ix), min(y0, iy), max(x1, ix), max(y1, iy))
+            return idx
+
+    def _candidates(self, ix0, iy0, ix1, iy1):
+        cells = self._cells
+        if (ix1 - ix0 + 1) * (iy1 - iy0 + 1) > len(cells):
+            # 질의 범위가 채워진 칸 수보다 넓으면 채워진 칸만 훑는다
+            for (ix, iy), ids in list(cells.items()):
+                if ix0 <= ix <= ix1 and iy0 <= iy <= iy1:
+                    yield from ids
+            return
+        for ix in range(ix0, ix1 + 1):
+            for iy in range(iy0, iy1 + 1):
+                ids = cells.get((ix, iy))
+                if ids:
+                    yield from ids
+
+    # 2. 반경 질의: [(거리m, item), ...] 가까운 순
+    def radius(self, lat, lng, meters, limit=None):
+        dlat = meters / M_PER_DEG_LAT
+        dlng = meters / (M_PER_DEG_LAT * max(math.cos(math.radians(lat)), 1e-6))
+        ix0, iy0 = self._cell(lat - dlat, lng - dlng)
+        ix1, iy1 = self._cell(lat + dlat, lng + dlng)
+        found = []
+        lats, lngs, items = self._lats, self._lngs, self._items
+        for idx in self._candidates(ix0, iy0, ix1, iy1):
+            d = geo.haversine(lat, lng, lats[idx], lngs[idx]) * 1000
+            if d <= meters:
+                found.append((d, idx))
+        found.sort()
+        if limit is not None:
+            found = found[:limit]
+        return [(d, items[idx]) for d, idx in found]
+
+    # 3. k-최근접: 가운데 칸부터 고리(ring) 모양으로 넓혀 가며 찾는다
+    # - 데이터 범위 밖에서 질의하면 빈 고리가 대부분이므로, 고리로 RING_SCAN_CELLS 칸을 보고도
+    #   못 끝내면 블록/칸을 질의점과의 최소 거리 순(힙)으로 꺼내 보는 방식으로 바꾼다
+    def nearest(self, lat, lng, k=5, max_meters=None):
+        if not self._items or k <= 0:
+            return []
+        cx, cy = self._cell(lat, lng)
+        x0, y0, x1, y1 = self._bounds
+        max_ring = max(abs(cx - x0), abs(cx - x1), abs(cy - y0), abs(cy - y1))
+        # 한 칸의 가장 짧은 변 길이(m) - 아직 안 본 고리 r 의 점은 최소 (r - 1) * cell_m 떨어져 있다
+        cell_m = self.cell_deg * M_PER_DEG_LAT * max(math.cos(math.radians(lat)), 1e-6)
+        best = []
+        # 데이터 범위에 닿기 전의 고리는 모두 비어 있으므로 건너뛴다
+        ring = max(0, x0 - cx, cx - x1, y0 - cy, cy - y1)
+        scanned = 0
+        while ring <= max_ring:
+            reach = (ring - 1) * cell_m
+            if len(best) >= k and best[k - 1][0] <= reach:
+                break
+            if max_meters is not None and reach > max_meters:
+                break
+            scanned += max(1, 8 * ring)
+            if scanned > RING_SCAN_CELLS:
+                return self._nearest_by_blocks(lat, lng, cx, cy, ring, k, max_meters, best)
+            self._scan_cells(lat, lng, _ring_cells(cx, cy, ring), k, max_meters, best)
+            ring += 1
+        return self._nearest_result(best)
+
+    # 고리 skip_ring 안쪽 칸은 이미 봤으므로 빼고, 최소 거리가 k 번째보다 멀어지면 끝
+    def _nearest_by_blocks(self, lat, lng, cx, cy, skip_ring, k, max_meters, best):
+        block_deg = self.cell_deg * BLOCK_CELLS
+        heap = [(self._rect_distance(lat, lng, by * block_deg, bx * block_deg, block_deg), 1, (bx, by))
+                for bx, by in list(self._blocks)]
+        heapq.heapify(heap)
+        cell_deg = self.cell_deg
+        half_rad = math.pi / 360  # 도 -> 라디안 / 2
+        diameter_m = 2 * geo.EARTH_RADIUS_KM * 1000
+        while heap:
+            floor, is_block, key = heapq.heappop(heap)
+            if len(best) >= k and best[k - 1][0] <= floor:
+                break
+            if max_meters is not None and floor > max_meters:
+                break
+            if not is_block:
+                self._scan_cells(lat, lng, (key,), k, max_meters, best)
+                continue
+            # 칸의 최소 거리 하한: 하버사인의 a 에서 cos(위도) 를 블록/질의점 중 가장 작은 값으로 바꾼 것
+            bx, by = key
+            edge = max(abs(lat), abs(by * block_deg), abs((by + 1) * block_deg))
+            cos2 = math.cos(math.radians(min(edge, 90.0))) ** 2
+            for ix, iy in list(self._blocks[key]):
+                if max(abs(ix - cx), abs(iy - cy)) < skip_ring:
+                    continue
+                south, west = iy * cell_deg, ix * cell_deg
+                dlat = max(0.0, south - lat, lat - south - cell_deg)
+                dlng = max(0.0, west - lng, lng - west - cell_deg)
+                a = math.sin(dlat * half_rad) ** 2 + cos2 * math.sin(dlng * half_rad) ** 2
+                d = diameter_m * math.asin(math.sqrt(min(1.0, a)))
+                heapq.heappush(heap, (max(d, floor), 0, (ix, iy)))
+        return self._nearest_result(best)
+
+    # 칸들의 점을 best 에 넣는다 (k 개까지). 지금 k 번째보다 먼 점은 하버사인의 a 값만 보고 거른다
+    def _scan_cells(self, lat, lng, cells, k, max_meters, best):
+        lats, lngs, coslats = self._lats, self._lngs, self._coslats
+        sin, radians = math.sin, math.radians
+        cos_lat = math.cos(radians(lat))
+        limit = best[k - 1][0] if len(best) >= k else max_meters
+        # 거리 limit(m) 에 해당하는 a 값 (조금 넉넉하게)
+        limit_a = 2.0 if limit is None else sin(min(math.pi / 2, limit / (2000 * geo.EARTH_RADIUS_KM))) ** 2 * 1.000001
+        for cell in cells:
+            for idx in self._cells.get(cell, ()):
+                a = sin(radians(lats[idx] - lat) / 2) ** 2 + cos_lat * coslats[idx] * sin(radians(lngs[idx] - lng) / 2) ** 2
+                if a > limit_a:
+                    continue
+                d = geo.haversine(lat, lng, lats[idx], lngs[idx]) * 1000
+                if max_meters is None or d <= max_meters:
+                    best.append((d, idx))
+        best.sort()
+        del best[k:]
+
+    def _nearest_result(self, best):
+        items = self._items
+        return [(d, items[idx]) for d, idx in best]
+
+    # 사각형(south, west, 한 변 size 도) 안에서 질의점에 가장 가까운 점까지의 거리(m)
+    # - 경도가 범위 밖이면 가장 가까운 점은 가까운 쪽 경선 위, 대원이 경선과 수직으로 만나는 위도
+    def _rect_distance(self, lat, lng, south, west, size):
+        near_lng = min(max(lng, west), west + size)
+        foot = lat
+        if near_lng != lng:
+            foot = math.degrees(math.atan(math.tan(math.radians(lat)) / math.cos(math.radians(lng - near_lng))))
+        near_lat = min(max(foot, south), south + size)
+        return geo.haversine(lat, lng, near_lat, near_lng) * 1000 - 0.001
+
+    # 가장 최근에 추가된 keep 개만 담은 새 인덱스 (key 도 그대로)
+    def trimmed(self, keep):
+        with self._lock:
+            keys = {idx: key for key, idx in self._keys.items()}
+            start = max(0, len(self._items) - keep)
+            rows = [(self._lats[i], self._lngs[i], self._items[i], keys.get(i)) for i in range(start, len(self._items))]
+        index = GridIndex(self.cell_deg)
+        for lat, lng, item, key in rows:
+            index.add(lat, lng, item, key=key)
+        return index
+
+    # 4. 영역 질의 (지도에 보이는 범위 안의 모든 점)
+    def bbox(self, south, west, north, east, limit=None):
+        ix0, iy0 = self._cell(south, west)
+        ix1, iy1 = self._cell(north, east)
+        lats, lngs, items = self._lats, self._lngs, self._items
+        found = []
+        for idx in self._candidates(ix0, iy0, ix1, iy1):
+            if south <= lats[idx] <= north and west <= lngs[idx] <= east:
+                found.append(items[idx])
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+
+
+def _ring_cells(cx, cy, ring):
+    if ring == 0:
+        yield (cx, cy)
+        return
+    for ix in range(cx - ring, cx + ring + 1):
+        yield (ix, cy - ring)
+        yield (ix, cy + ring)
+    for iy in range(cy - ring + 1, cy + ring):
+        yield (cx - ring, iy)
+        yield (cx + ring, iy)
+
+
+# 이름별 인덱스 레지스트리 (이름당 프로세스에 하나, 세션끼리 공유)
+# - max_items 를 주면 그보다 많아졌을 때 오래된 점부터 10% 를 뺀 새 인덱스로 바꾼다
+#   (인덱스 자체는 추가만 하므로, 이미 받아 간 세션은 이전 인덱스를 끝까지 안전하게 본다)
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def named_index(name, cell_deg=0.005, max_items=None):
+    with _indexes_lock:
+        index = _indexes.get(name)
+        if index is None:
+            index = _indexes[name] = GridIndex(cell_deg)
+        elif max_items and len(index) > max_items:
+            index = _indexes[name] = index.trimmed(max_items - max_items // 10)
+        return index
@@ -0,0 +1,82 @@
+# 날씨 / 환율 조회 (OpenWeather, ExchangeRate-API)
+# - 모든 세션이 공유하는 캐시를 거쳐서 호출 (rerun 마다 외부 API를 부르지 않도록)
+# - refresh_* 는 메모리 캐시를 건너뛰고 새로 받아서 캐시에 넣는다 (백그라운드 prefetch 용)
+#   디스크 캐시도 max_age(보통 prefetch 작업 간격)보다 오래된 응답이면 업스트림에 다시 확인한다
+# - 업스트림 호출은 디스크 캐시를 거치므로 다른 레플리카가 방금 받은 응답이면 그대로 재사용
+import os
+
+from . import http_client
+from .ttl_cache import named_cache
+
+# 캐시 유지 시간(초): 날씨 10분, 환율 1시간. 만료 후 stale 구간 동안은 이전 값을 보여주며 백그라운드 갱신
+WEATHER_TTL = int(os.getenv("WEATHER_CACHE_TTL", 600))
+WEATHER_STALE_TTL = int(os.getenv("WEATHER_CACHE_STALE_TTL", 3600))
+EXCHANGE_TTL = int(os.getenv("EXCHANGE_CACHE_TTL", 3600))
+EXCHANGE_STALE_TTL = int(os.getenv("EXCHANGE_CACHE_STALE_TTL", 86400))
+
+# API 주소 (벤치마크/테스트에서는 로컬 스텁 서버로 바꿔서 사용)
+OPENWEATHER_API_BASE = os.getenv("OPENWEATHER_API_BASE", "https://api.openweathermap.org")
+EXCHANGE_API_BASE = os.getenv("EXCHANGE_API_BASE", "https://v6.exchangerate-api.com")
+WEATHER_URL = f"{OPENWEATHER_API_BASE}/data/2.5/weather"
+EXCHANGE_URL = EXCHANGE_API_BASE + "/v6/{api_key}/latest/USD"
+
+
+def weather_cache():
+    return named_cache("weather", WEATHER_TTL, WEATHER_STALE_TTL)
+
+
+def exchange_cache():
+    return named_cache("exchange_rate", EXCHANGE_TTL, EXCHANGE_STALE_TTL)
+
+
+def _weather_key(lat, lng):
+    return (round(lat, 4), round(lng, 4))
+
+
+# 1. 업스트림 호출 (실패하면 None)
+def fetch_weather(lat, lng, api_key, max_age=None):
+    # 보안 에러 방지를 위해 https 사용
+    params = {"lat": lat, "lon": lng, "appid": api_key, "units": "metric"}
+    try:
+        return http_client.get_json_cached("openweather", WEATHER_URL, params=params, ttl=WEATHER_TTL, max_age=max_age)
+    except http_client.UpstreamError:
+        return None
+
+
+def fetch_exchange_rate(api_key, max_age=None):
+    try:
+        data = http_client.get_json_cached(
+            "exchangerate", EXCHANGE_URL.format(api_key=api_key), ttl=EXCHANGE_TTL, max_age=max_age
+        )
+        return data['conversion_rates']['KRW']
+    except (http_client.UpstreamError, KeyError, TypeError):
+        return None
+
+
+# 2. 캐시를 거쳐서 조회 (화면에서 사용)
+def get_weather(lat, lng, api_key):
+    if not api_key: return None
+    return weather_cache().get(_weather_key(lat, lng), lambda: fetch_weather(lat, lng, api_key))
+
+
+def get_exchange_rate(api_key):
+    if not api_key: return None
+    return exchange_cache().get("USD/KRW", lambda: fetch_exchange_rate(api_key))
+
+
+# 3. 새로 받아서 캐시에 넣기 (성공하면 True)
+# max_age 안에 다른 레플리카가 받아 둔 디스크 캐시 응답이면 업스트림을 부르지 않고 그걸 쓴다
+def refresh_weather(lat, lng, api_key, max_age):
+    data = fetch_weather(lat, lng, api_key, max_age=max_age)
+    if data is None:
+        return False
+    weather_cache().put(_weather_key(lat, lng), data)
+    return True
+
+
+def refresh_exchange_rate(api_key, max_age):
+    rate = fetch_exchange_rate(api_key, max_age=max_age)
+    if rate is None:
+        return False
+    exchange_cache().put("USD/KRW", rate)
+    return True
@@ -0,0 +1,134 @@
+# 프로세스 전체에서 공유하는 TTL 캐시 (stale-while-revalidate)
+# - 스트림릿은 rerun 마다 스크립트를 다시 실행하지만 import 된 모듈은 프로세스에 한 번만 올라온다.
+#   그래서 캐시 객체는 스크립트가 아닌 이 모듈에 두고 모든 세션이 같이 쓴다.
+# - ttl 이 지난 값은 stale_ttl 동안 그대로 돌려주면서 백그라운드에서 한 번만 갱신한다.
+# - 같은 키로 동시에 캐시 미스가 나면 업스트림 호출은 한 번만 하고 나머지는 그 결과를 기다린다.
+# - max_entries 를 주면 가장 오래 안 쓴 항목부터 지운다 (LRU). 적중/미스 횟수는 stats() 로 확인.
+import threading
+import time
+from collections import OrderedDict
+
+from . import metrics
+
+
+class _Entry:
+    __slots__ = ("value", "stored_at")
+
+    def __init__(self, value, stored_at):
+        self.value = value
+        self.stored_at = stored_at
+
+
+class TTLCache:
+    def __init__(self, ttl, stale_ttl=0, max_entries=None, wait_timeout=10.0):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self._entries = OrderedDict()
+        self._stats = {"hits": 0, "stale_hits": 0, "misses": 0, "waits": 0, "evictions": 0}
+        self._inflight = {}  # key -> threading.Event (로딩 중인 키)
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry.stored_at
+                if age < self.ttl:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    metrics.mark(hit=True)
+                    return entry.value
+                if age < self.ttl + self.stale_ttl:
+                    # 오래된 값은 바로 돌려주고, 갱신은 백그라운드에서 한 번만
+                    self._entries.move_to_end(key)
+                    self._stats["stale_hits"] += 1
+                    metrics.mark(hit=True)
+                    if key not in self._inflight:
+                        self._inflight[key] = threading.Event()
+                        threading.Thread(
+                            target=self._load, args=(key, loader), daemon=True
+                        ).start()
+                    return entry.value
+            event = self._inflight.get(key)
+            owner = event is None
+            if owner:
+                event = self._inflight[key] = threading.Event()
+                self._stats["misses"] += 1
+            else:
+                self._stats["waits"] += 1
+
+        metrics.mark(hit=False)
+        if owner:
+            return self._load(key, loader)
+
+        # 다른 스레드가 같은 키를 불러오는 중이면 그 결과를 기다린다
+        event.wait(self.wait_timeout)
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry.value if entry is not None else None
+
+    # ttl 안의 값만 (없거나 만료됐으면 None, 불러오지 않는다)
+    def peek(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry.stored_at >= self.ttl:
+                return None
+            return entry.value
+
+    def put(self, key, value):
+        with self._lock:
+            self._store(key, value)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, size=len(self._entries))
+
+    # 잠금을 잡은 상태에서만 호출
+    def _store(self, key, value):
+        self._entries[key] = _Entry(value, time.monotonic())
+        self._entries.move_to_end(key)
+        if self.max_entries is not None:
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def _load(self, key, loader):
+        value = None
+        try:
+            value = loader()
+        except Exception:
+            value = None
+        finally:
+            with self._lock:
+                # 실패(None)는 저장하지 않는다 - 기존 stale 값이 있으면 그대로 유지
+                if value is not None:
+                    self._store(key, value)
+                event = self._inflight.pop(key, None)
+            if event is not None:
+                event.set()
+        return value
+
+
+# 소스별 캐시 레지스트리 (이름당 프로세스에 하나)
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def named_cache(name, ttl, stale_ttl=0, max_entries=None):
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = _caches[name] = TTLCache(ttl, stale_ttl, max_entries)
+        else:
+            # 설정 값이 바뀌면(환경변수 등) 바로 반영
+            cache.ttl = ttl
+            cache.stale_ttl = stale_ttl
+            cache.max_entries = max_entries
+        return cache